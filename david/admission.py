@@ -0,0 +1,96 @@
+import threading
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    # 동시 처리 한도 + 대기열이 가득 찼거나 대기 시간이 지남 -> 503
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    # 합성 경로 앞단의 프로세스별 입장 제한: 최대 max_inflight개 처리, max_queue개까지 timeout초 대기
+    def __init__(self, max_inflight, max_queue, timeout, retry_after=1):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.inflight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            if self.inflight >= self.max_inflight:
+                if self.waiting >= self.max_queue:
+                    self.shed += 1
+                    raise Overloaded('요청이 많아 잠시 후 다시 시도하세요.', self.retry_after)
+                self.waiting += 1
+                try:
+                    ok = self.cond.wait_for(lambda: self.inflight < self.max_inflight, self.timeout)
+                finally:
+                    self.waiting -= 1
+                if not ok:
+                    self.timed_out += 1
+                    raise Overloaded('요청이 많아 잠시 후 다시 시도하세요.', self.retry_after)
+            self.inflight += 1
+            self.admitted += 1
+
+    def release(self):
+        with self.cond:
+            self.inflight -= 1
+            self.cond.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def releasing(self, iterable):
+        # 스트리밍 응답: 본문 전송이 끝나거나 연결이 닫힐 때 슬롯 반환
+        return ReleasingIterable(iterable, self.release)
+
+    def stats(self):
+        return {
+            'inflight': self.inflight,
+            'waiting': self.waiting,
+            'admitted': self.admitted,
+            'shed': self.shed,
+            'timed_out': self.timed_out,
+        }
+
+
+class ReleasingIterable:
+    # 다 읽었을 때와 WSGI 서버가 close()를 부를 때 중 먼저 오는 쪽에서 한 번만 release
+    def __init__(self, iterable, release):
+        self.iterable = iterable
+        self.release_fn = release
+        self.released = False
+        self.lock = threading.Lock()
+
+    def _release(self):
+        with self.lock:
+            if self.released:
+                return
+            self.released = True
+        self.release_fn()
+
+    def __iter__(self):
+        try:
+            yield from self.iterable
+        finally:
+            self._release()
+
+    def close(self):
+        try:
+            if hasattr(self.iterable, 'close'):
+                self.iterable.close()
+        finally:
+            self._release()
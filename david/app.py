@@ -1,12 +1,236 @@
-from flask import Flask, render_template, request
-from gtts import gTTS
+from flask import Flask, render_template, request, jsonify, Response, url_for, stream_with_context, g, abort, send_from_directory
+from werkzeug.security import safe_join
 import base64
-from io import BytesIO
+import hashlib
+import os
+import re
 import socket
-app = Flask(__name__)
+import time
+from tts_cache import AudioCache, DiskCache, TextStore, cache_key, normalize_text
+from shared_store import SharedAudioStore
+from tts_pool import SynthesisPool, PoolBusy
+from request_log import RequestLog
+from tts_batch import parse_items, stream_zip
+from tts_chunks import split_sentences, strip_id3v2
+from tts_backend import create_backend
+from metrics import Metrics
+from admission import AdmissionController, Overloaded
+# 정적 파일은 아래 static() 라우트에서 내용 해시 ETag와 함께 직접 제공
+app = Flask(__name__, static_folder=None)
 
 # 유효한 언어 목록 (보너스: lang 검증)
 VALID_LANGUAGES = ['ko', 'en', 'ja', 'es']
+
+# 합성 백엔드: 'gtts', 'stub'(부하 테스트용 무음 MP3), 'gtts,stub'(실패 시 다음으로)
+# stub으로 부하 테스트할 때는 TTS_CACHE_DIR도 따로 지정할 것
+backend = create_backend(
+    os.environ.get('TTS_BACKEND', 'gtts'),
+    stub_latency=float(os.environ.get('TTS_STUB_LATENCY', 0)),
+    stub_ms_per_char=float(os.environ.get('TTS_STUB_MS_PER_CHAR', 60)),
+)
+
+# 합성 결과 캐시 설정 (워커별 메모리 LRU + 디스크)
+# 디스크 계층: 'sqlite' = 모든 워커가 공유하는 SQLite(WAL) 저장소, 'files' = 키마다 파일 하나
+# 공유 저장소를 쓰면 워커별 메모리 계층은 작게(또는 0으로) 두어도 됨
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_MEMORY_BYTES = int(os.environ.get('TTS_CACHE_MEMORY_BYTES', 32 * 1024 * 1024))
+CACHE_DISK_BYTES = int(os.environ.get('TTS_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+CACHE_DIR = os.environ.get('TTS_CACHE_DIR', os.path.join(BASE_DIR, 'tts_cache'))
+CACHE_STORE = os.environ.get('TTS_CACHE_STORE', 'sqlite')
+if CACHE_STORE == 'sqlite':
+    disk_store = SharedAudioStore(os.path.join(CACHE_DIR, 'audio.db'), CACHE_DISK_BYTES)
+elif CACHE_STORE == 'files':
+    disk_store = DiskCache(CACHE_DIR, CACHE_DISK_BYTES)
+else:
+    disk_store = None
+audio_cache = AudioCache(CACHE_MEMORY_BYTES, disk_store)
+
+# 폼에서 받은 텍스트는 키로 보관하고 페이지에는 /tts/<key>.mp3 만 넣음
+# (긴 텍스트를 쿼리 문자열에 넣으면 gunicorn 요청 줄 길이 제한(4094바이트)에 걸려 400)
+TEXT_MAX_AGE = int(os.environ.get('TTS_TEXT_MAX_AGE', 86400))
+text_store = TextStore(os.path.join(CACHE_DIR, 'texts'), max_age=TEXT_MAX_AGE)
+KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+# 합성 스레드 풀 설정 (동시 합성 수, 슬롯 대기 시간, 조각당 응답 대기 시간)
+POOL_WORKERS = int(os.environ.get('TTS_POOL_WORKERS', 4))
+QUEUE_TIMEOUT = float(os.environ.get('TTS_QUEUE_TIMEOUT', 5))
+SYNTH_TIMEOUT = float(os.environ.get('TTS_SYNTH_TIMEOUT', 30))
+synthesis_pool = SynthesisPool(POOL_WORKERS, QUEUE_TIMEOUT)
+
+# 긴 텍스트는 문장 조각(최대 CHUNK_CHARS자)으로 나눠 CHUNK_PARALLELISM개씩 미리 합성
+CHUNK_CHARS = int(os.environ.get('TTS_CHUNK_CHARS', 100))
+CHUNK_PARALLELISM = int(os.environ.get('TTS_CHUNK_PARALLELISM', POOL_WORKERS))
+
+# 일괄 변환 API 설정 (요청당 최대 항목 수, 동시 합성 수)
+BATCH_MAX_ITEMS = int(os.environ.get('TTS_BATCH_MAX_ITEMS', 500))
+BATCH_PARALLELISM = int(os.environ.get('TTS_BATCH_PARALLELISM', POOL_WORKERS))
+
+# 입력 로그: 백그라운드 스레드가 배치로 기록 (요청 경로는 디스크를 기다리지 않음)
+request_log = RequestLog(
+    os.environ.get('TTS_LOG_PATH', 'input_log.txt'),
+    batch_size=int(os.environ.get('TTS_LOG_BATCH', 100)),
+    flush_interval=float(os.environ.get('TTS_LOG_FLUSH_INTERVAL', 1.0)),
+    max_bytes=int(os.environ.get('TTS_LOG_MAX_BYTES', 10 * 1024 * 1024)),
+    per_worker=os.environ.get('TTS_LOG_PER_WORKER', '0') == '1',
+)
+
+# 합성 경로 입장 제한 (워커 프로세스별). 나머지 스레드는 home/menu/test3 같은 가벼운 경로용으로 남음
+# 예) gunicorn --threads 8: 최대 4개 합성 + 2개 대기 -> 적어도 2개 스레드는 항상 비어 있음
+admission = AdmissionController(
+    max_inflight=int(os.environ.get('TTS_MAX_INFLIGHT', 4)),
+    max_queue=int(os.environ.get('TTS_MAX_QUEUE', 2)),
+    timeout=float(os.environ.get('TTS_ADMISSION_TIMEOUT', 2)),
+    retry_after=int(os.environ.get('TTS_RETRY_AFTER', 1)),
+)
+
+# 구간별 시간/요청 수 지표. TTS_METRICS_DIR을 주면 워커들이 그 디렉터리로 모아 /metrics에서 합산
+METRICS_DIR = os.environ.get('TTS_METRICS_DIR')
+metrics = Metrics('tts', shared_dir=METRICS_DIR)
+
+# HTTP 캐시 유효 시간 (초). 같은 text+lang URL은 같은 오디오이므로 길게 둠
+AUDIO_MAX_AGE = int(os.environ.get('TTS_AUDIO_MAX_AGE', 86400))
+STATIC_MAX_AGE = int(os.environ.get('TTS_STATIC_MAX_AGE', 3600))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+static_etags = {}
+
+# 1이면 예전처럼 MP3를 base64로 HTML에 직접 넣음 (기본은 /tts/<key>.mp3 URL 참조)
+INLINE_AUDIO = os.environ.get('TTS_INLINE_AUDIO', '0') == '1'
+
+
+def synthesize_stream(text, lang):
+    # 설정된 백엔드가 만드는 MP3 조각을 그대로 흘려보냄
+    chunks = backend.stream(text, lang)
+    timed = metrics.timed_iter('synthesize', chunks)
+    if getattr(chunks, 'cacheable', True):
+        return timed
+    return NoCache(timed)
+
+
+class NoCache:
+    # 지표용으로 감싼 뒤에도 대체 백엔드 결과임을 풀에 알림
+    cacheable = False
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+def start_synthesis(key, input_text, lang):
+    # 같은 키가 이미 합성 중이면 그 결과를 공유, 끝나면 캐시에 저장
+    return synthesis_pool.flight(
+        key, synthesize_stream, normalize_text(input_text), lang,
+        on_done=lambda audio: audio_cache.put(key, audio),
+    )
+
+
+def iter_audio(key, input_text, lang):
+    # 캐시 miss일 때의 MP3 조각 스트림 (긴 텍스트는 문장 조각별 병렬 합성)
+    pieces = split_sentences(normalize_text(input_text), CHUNK_CHARS)
+    if len(pieces) <= 1:
+        return start_synthesis(key, input_text, lang).iter_chunks(SYNTH_TIMEOUT)
+    return iter_pieces(key, pieces, lang)
+
+
+def iter_pieces(key, pieces, lang):
+    # 앞쪽 조각부터 순서대로 흘려보내는 동안 뒤쪽 조각을 미리 합성
+    started = {}
+
+    def start(i):
+        if i < len(pieces) and i not in started:
+            piece_key = cache_key(pieces[i], lang)
+            audio = audio_cache.get(piece_key, count=False)  # 조각 단위 캐시 재사용 (요청 hit/miss 통계에는 넣지 않음)
+            started[i] = [audio] if audio is not None else start_synthesis(piece_key, pieces[i], lang)
+
+    for i in range(CHUNK_PARALLELISM):
+        start(i)
+    parts = []
+    cacheable = True
+    for i in range(len(pieces)):
+        start(i)
+        piece = started.pop(i)
+        chunks = piece if isinstance(piece, list) else piece.iter_chunks(SYNTH_TIMEOUT)
+        for n, chunk in enumerate(chunks):
+            if i > 0 and n == 0:
+                chunk = strip_id3v2(chunk)
+            parts.append(chunk)
+            yield chunk
+        cacheable = cacheable and getattr(piece, 'cacheable', True)
+        start(i + CHUNK_PARALLELISM)
+    # 전체 텍스트도 캐시 -> 다음 요청은 이어 붙일 필요 없음
+    if cacheable:
+        audio_cache.put(key, b''.join(parts))
+
+
+def fetch_audio(input_text, lang, key=None, checked=False):
+    # 캐시 -> (miss) 풀에서 합성한 MP3 바이트. checked=True: 호출자가 이미 캐시를 확인함 (miss를 두 번 세지 않음)
+    key = key or cache_key(input_text, lang)
+    audio = None
+    if not checked:
+        with metrics.timer('cache_lookup'):
+            audio = audio_cache.get(key)
+    if audio is None:
+        with metrics.timer('buffer'):
+            audio = b''.join(iter_audio(key, input_text, lang))
+    return audio
+
+
+def validate_input(input_text, lang):
+    # 오류 메시지 또는 None
+    if lang not in VALID_LANGUAGES:
+        return '유효하지 않은 언어입니다. ko, en, ja, es 중 선택하세요.'
+    if not input_text or not input_text.strip():
+        return '텍스트를 입력하세요.'
+    return None
+
+
+def audio_response(audio, headers):
+    # 내용 해시 strong ETag + Cache-Control, If-None-Match -> 304, Range -> 206
+    response = Response(audio, mimetype='audio/mpeg', headers=headers)
+    response.set_etag(hashlib.sha256(audio).hexdigest())
+    response.cache_control.public = True
+    response.cache_control.max_age = AUDIO_MAX_AGE
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(audio))
+
+
+def needs_full_audio(req):
+    if req.if_none_match:
+        return True
+    rng = req.range
+    return rng is not None and not (rng.units == 'bytes' and rng.ranges == [(0, None)])
+
+
+def static_etag(path):
+    # 파일 내용 해시 (mtime/크기가 바뀔 때만 다시 계산)
+    st = os.stat(path)
+    cached = static_etags.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    with open(path, 'rb') as f:
+        etag = hashlib.sha256(f.read()).hexdigest()
+    static_etags[path] = (st.st_mtime_ns, st.st_size, etag)
+    return etag
+
+
+def overloaded_response(e):
+    metrics.inc('errors', stage='overloaded')
+    return Response(str(e), status=503, mimetype='text/plain', headers={'Retry-After': str(e.retry_after)})
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    # 스트리밍 응답은 헤더를 보낼 때까지의 시간
+    endpoint = request.endpoint or 'unknown'
+    metrics.inc('requests', endpoint=endpoint, status=response.status_code)
+    metrics.observe('request_seconds', time.perf_counter() - g.request_start, endpoint=endpoint)
+    return response
+
 @app.route('/')
 def home():
     if app.debug:
@@ -22,40 +246,165 @@ def index():
         input_text = request.form.get('input_text')
         lang = request.form.get('lang', 'ko')  # 기본 ko
         
-        # 보너스: lang 유효성 검증
-        if lang not in VALID_LANGUAGES:
-            return render_template('index.html', error='유효하지 않은 언어입니다. ko, en, ja, es 중 선택하세요.')
-        
-        # 예외 처리: 빈 텍스트
-        if not input_text.strip():
-            return render_template('index.html', error='텍스트를 입력하세요.')
+        # 보너스: lang 유효성 검증 / 예외 처리: 빈 텍스트
+        with metrics.timer('validate'):
+            error = validate_input(input_text, lang)
+        if error:
+            metrics.inc('errors', stage='validate')
+            return render_template('index.html', error=error)
         
         try:
-            # TTS 변환
-            tts = gTTS(text=input_text, lang=lang)
-            
-            # 메모리에 MP3 저장 (파일로 저장하지 않음)
-            audio_buffer = BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-            
-            # base64 인코딩
-            audio_base64 = base64.b64encode(audio_buffer.read()).decode('utf-8')
+            if INLINE_AUDIO:
+                # TTS 변환 (같은 텍스트+언어는 캐시에서 바로 가져옴)
+                with admission.slot():
+                    audio = fetch_audio(input_text, lang)
+                
+                # base64 인코딩
+                with metrics.timer('base64'):
+                    audio_base64 = base64.b64encode(audio).decode('utf-8')
+                with metrics.timer('render'):
+                    page = render_template('index.html', audio=audio_base64)
+            else:
+                # 오디오는 브라우저가 /tts/<key>.mp3 에서 따로 스트리밍으로 받음
+                key = cache_key(input_text, lang)
+                text_store.put(key, normalize_text(input_text), lang)
+                with metrics.timer('render'):
+                    page = render_template(
+                        'index.html',
+                        audio_url=url_for('tts_key', key=key),
+                        download_url=url_for('tts_key', key=key, download=1),
+                    )
             
             # 보너스: 입력 로그 저장
-            with open('input_log.txt', 'a', encoding='utf-8') as log_file:
-                log_file.write(f"Text: {input_text}, Lang: {lang}\n")
+            request_log.log(f"Text: {input_text}, Lang: {lang}")
             
-            return render_template('index.html', audio=audio_base64)
+            return page
         
+        except Overloaded as e:
+            # 과부하: 오래 기다리게 하지 않고 바로 안내
+            metrics.inc('errors', stage='overloaded')
+            page = render_template('index.html', error=str(e))
+            return page, 503, {'Retry-After': str(e.retry_after)}
         except Exception as e:
             # gTTS 실패 등 예외 처리
+            metrics.inc('errors', stage='index')
             return render_template('index.html', error=f'오류 발생: {str(e)}')
     
     # GET: 폼 렌더링
     return render_template('index.html')
 
 
+@app.route('/tts.mp3')
+def tts_mp3():
+    input_text = request.args.get('text', '')
+    lang = request.args.get('lang', 'ko')
+    with metrics.timer('validate'):
+        error = validate_input(input_text, lang)
+    if error:
+        metrics.inc('errors', stage='validate')
+        return Response(error, status=400, mimetype='text/plain')
+    return serve_audio(cache_key(input_text, lang), input_text, lang)
+
+
+@app.route('/tts/<key>.mp3')
+def tts_key(key):
+    # index()가 넣은 짧은 URL. 텍스트는 text_store에서 찾음 (오디오가 캐시에 있으면 텍스트 없이도 응답)
+    if not KEY_PATTERN.fullmatch(key):
+        abort(404)
+    entry = text_store.get(key)
+    input_text, lang = entry if entry is not None else (None, None)
+    return serve_audio(key, input_text, lang)
+
+
+def serve_audio(key, input_text, lang):
+    headers = {}
+    if request.args.get('download'):
+        headers['Content-Disposition'] = 'attachment; filename="tts_output.mp3"'
+
+    # 캐시 hit: 길이와 내용을 알고 있으므로 Content-Length, ETag, Range 모두 지원
+    with metrics.timer('cache_lookup'):
+        audio = audio_cache.get(key)
+    if audio is not None:
+        return audio_response(audio, headers)
+    if input_text is None:
+        metrics.inc('errors', stage='unknown_key')
+        return Response('만료되었거나 알 수 없는 오디오입니다. 다시 변환하세요.', status=404, mimetype='text/plain')
+
+    # 캐시 miss: 입장 제한을 통과한 요청만 합성 (캐시 hit는 과부하 중에도 바로 응답)
+    try:
+        admission.acquire()
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    # 중간부터의 Range/If-None-Match는 전체 내용이 있어야 답할 수 있으므로 스트리밍 대신 끝까지 합성
+    # (브라우저 <audio>가 처음 보내는 'bytes=0-'는 전체 요청과 같으므로 200 스트리밍)
+    if needs_full_audio(request):
+        try:
+            audio = fetch_audio(input_text, lang, key, checked=True)
+        except PoolBusy as e:
+            metrics.inc('errors', stage='pool_busy')
+            return Response(str(e), status=503, mimetype='text/plain', headers={'Retry-After': '1'})
+        except Exception as e:
+            metrics.inc('errors', stage='tts_mp3')
+            return Response(f'오류 발생: {str(e)}', status=502, mimetype='text/plain')
+        finally:
+            admission.release()
+        return audio_response(audio, headers)
+
+    # 풀에서 합성 중인 조각을 받는 대로 전송 (캐시 저장은 풀이 처리)
+    try:
+        chunks = iter_audio(key, input_text, lang)
+        # 첫 조각을 미리 받아 백엔드 오류는 정상적인 오류 응답으로 처리
+        first = next(chunks, b'')
+    except PoolBusy as e:
+        admission.release()
+        metrics.inc('errors', stage='pool_busy')
+        return Response(str(e), status=503, mimetype='text/plain', headers={'Retry-After': '1'})
+    except Exception as e:
+        admission.release()
+        metrics.inc('errors', stage='tts_mp3')
+        return Response(f'오류 발생: {str(e)}', status=502, mimetype='text/plain')
+
+    def generate():
+        yield first
+        yield from chunks
+
+    # 슬롯은 본문 전송이 끝날 때 반환
+    body = admission.releasing(stream_with_context(generate()))
+    response = Response(body, mimetype='audio/mpeg', headers=headers)
+    response.cache_control.public = True
+    response.cache_control.max_age = AUDIO_MAX_AGE
+    return response
+
+@app.route('/api/tts/batch', methods=['POST'])
+def tts_batch():
+    # [{"text": ..., "lang": ...}, ...] -> MP3 묶음 ZIP (+ manifest.json에 항목별 결과)
+    items, error = parse_items(request.get_json(silent=True), VALID_LANGUAGES, BATCH_MAX_ITEMS)
+    if error:
+        return jsonify(error=error), 400
+
+    for item in items:
+        if item['error'] is None:
+            request_log.log(f"Text: {item['text']}, Lang: {item['lang']}")
+
+    # 일괄 요청 하나가 전송이 끝날 때까지 슬롯 하나를 차지
+    try:
+        admission.acquire()
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    headers = {'Content-Disposition': 'attachment; filename="tts_batch.zip"'}
+    body = admission.releasing(stream_zip(items, fetch_audio, BATCH_PARALLELISM))
+    return Response(body, mimetype='application/zip', headers=headers)
+
+
+@app.route('/static/<path:filename>', endpoint='static')
+def static(filename):
+    path = safe_join(STATIC_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return send_from_directory(STATIC_DIR, filename, etag=static_etag(path), max_age=STATIC_MAX_AGE)
+
 
 @app.route("/test3")
 def test3():
@@ -64,5 +413,24 @@ def test3():
 def menu():
     return render_template('menu.html')
 
+@app.route('/cache/stats')
+def cache_stats():
+    # 캐시 hit/miss/eviction 카운터 + 합성 풀 상태
+    return jsonify({**audio_cache.stats(), 'pool': synthesis_pool.stats(), 'log': request_log.stats(),
+                    'admission': admission.stats()})
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Prometheus 텍스트 형식. 공유 디렉터리가 있으면 전체 워커 합산 (?scope=worker 는 이 워커만)
+    gauges = {'cache_' + name: value for name, value in audio_cache.stats().items()}
+    gauges.update({'pool_' + name: value for name, value in synthesis_pool.stats().items()})
+    gauges.update({'log_' + name: value for name, value in request_log.stats().items()})
+    gauges.update({'admission_' + name: value for name, value in admission.stats().items()})
+    if hasattr(backend, 'fallbacks'):
+        gauges['backend_fallbacks'] = backend.fallbacks
+    aggregate = bool(METRICS_DIR) and request.args.get('scope') != 'worker'
+    return Response(metrics.render(gauges, aggregate=aggregate), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=True)
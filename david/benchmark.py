@@ -0,0 +1,278 @@
+import argparse
+import html
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlencode
+
+# 부하 테스트: 로컬 stub 백엔드로 david/app.py를 Flask test client와 실제 gunicorn 두 가지로 구동
+# 사용 예) python benchmark.py --targets client,gunicorn --requests 500 --concurrency 8
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 비교할 모드: 예전 base64 인라인 vs /tts/<key>.mp3 스트리밍, 캐시 있음/없음
+SCENARIOS = {
+    'inline-nocache': {'TTS_INLINE_AUDIO': '1', 'TTS_CACHE_MEMORY_BYTES': '0', 'TTS_CACHE_STORE': 'none'},
+    'inline-cache': {'TTS_INLINE_AUDIO': '1'},
+    'stream-nocache': {'TTS_INLINE_AUDIO': '0', 'TTS_CACHE_MEMORY_BYTES': '0', 'TTS_CACHE_STORE': 'none'},
+    'stream-cache': {'TTS_INLINE_AUDIO': '0'},
+}
+
+
+def load_workload(path):
+    # input_log.txt의 'Text: ..., Lang: ..' 줄 -> (text, lang) 목록 (텍스트 안의 쉼표 허용)
+    items = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line.startswith('Text: ') or ', Lang: ' not in line:
+                    continue
+                text, lang = line[len('Text: '):].rsplit(', Lang: ', 1)
+                if text.strip():
+                    items.append((text, lang.strip()))
+    except FileNotFoundError:
+        pass
+    return items or [('안녕하세요', 'ko'), ('Hello', 'en')]
+
+
+def audio_path(page):
+    # 폼 응답 페이지의 <audio> 주소 (/tts/<key>.mp3) -> 실제 브라우저와 같은 경로로 오디오 요청
+    match = re.search(r'<source src="([^"]+)"', page)
+    if match is None:
+        raise RuntimeError('audio_url not found in page')
+    return html.unescape(match.group(1))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+def drive(send, workload, requests, concurrency, seed):
+    # 같은 seed -> 모든 모드에서 같은 요청 순서
+    rng = random.Random(seed)
+    plan = [rng.choice(workload) for _ in range(requests)]
+    latencies = []
+    sizes = []
+    errors = 0
+
+    def one(item):
+        start = time.perf_counter()
+        try:
+            size = send(*item)
+        except Exception:
+            return None, 0
+        return time.perf_counter() - start, size
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, size in executor.map(one, plan):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+                sizes.append(size)
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': requests,
+        'errors': errors,
+        'elapsed_s': round(elapsed, 4),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'latency_p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'bytes_per_response': round(sum(sizes) / len(sizes), 1) if sizes else 0,
+    }
+
+
+def scenario_env(scenario, workdir, stub_latency):
+    env = dict(os.environ)
+    env.update({
+        'TTS_BACKEND': 'stub',
+        'TTS_STUB_LATENCY': str(stub_latency),
+        'TTS_CACHE_DIR': os.path.join(workdir, 'cache'),
+        'TTS_LOG_PATH': os.path.join(workdir, 'input_log.txt'),
+    })
+    env.pop('TTS_METRICS_DIR', None)
+    env.update(SCENARIOS[scenario])
+    return env
+
+
+# --- Flask test client (환경 변수를 import 시점에 읽으므로 모드마다 하위 프로세스에서 실행) ---
+
+def run_client(args):
+    sys.path.insert(0, BASE_DIR)
+    import app as app_module
+
+    inline = app_module.INLINE_AUDIO
+
+    def send(text, lang):
+        client = app_module.app.test_client()
+        response = client.post('/', data={'input_text': text, 'lang': lang})
+        if response.status_code != 200:
+            raise RuntimeError(response.status_code)
+        size = len(response.data)
+        if not inline:
+            audio = client.get(audio_path(response.get_data(as_text=True)))
+            if audio.status_code != 200:
+                raise RuntimeError(audio.status_code)
+            size += len(audio.data)
+        return size
+
+    result = drive(send, load_workload(args.workload), args.requests, args.concurrency, args.seed)
+    # ru_maxrss: Linux는 KB 단위
+    result['rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(json.dumps(result))
+
+
+def bench_client(scenario, args, workdir):
+    cmd = [sys.executable, os.path.abspath(__file__), '--_client',
+           '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+           '--seed', str(args.seed), '--workload', args.workload]
+    out = subprocess.run(cmd, env=scenario_env(scenario, workdir, args.stub_latency), cwd=workdir,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# --- 실제 gunicorn 프로세스 ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def worker_rss_mb(master_pid):
+    # 마스터의 자식 프로세스(워커)별 VmRSS
+    rss = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            if ppid != master_pid:
+                continue
+            with open(f'/proc/{entry}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        rss.append(round(int(line.split()[1]) / 1024, 1))
+        except (OSError, ValueError, IndexError):
+            continue
+    return rss
+
+
+def http_request(port, method, path, body=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'} if body else {}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise RuntimeError(response.status)
+        return data
+    finally:
+        conn.close()
+
+
+def bench_gunicorn(scenario, args, workdir):
+    port = free_port()
+    env = scenario_env(scenario, workdir, args.stub_latency)
+    cmd = ['gunicorn', 'app:app', '--chdir', BASE_DIR, '--bind', f'127.0.0.1:{port}',
+           '--workers', str(args.workers), '--threads', str(args.threads)]
+    proc = subprocess.Popen(cmd, env=env, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                http_request(port, 'GET', '/menu')
+                break
+            except (OSError, RuntimeError):
+                if time.time() > deadline or proc.poll() is not None:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.2)
+
+        inline = SCENARIOS[scenario].get('TTS_INLINE_AUDIO') == '1'
+
+        def send(text, lang):
+            page = http_request(port, 'POST', '/', urlencode({'input_text': text, 'lang': lang}))
+            size = len(page)
+            if not inline:
+                size += len(http_request(port, 'GET', audio_path(page.decode('utf-8'))))
+            return size
+
+        result = drive(send, load_workload(args.workload), args.requests, args.concurrency, args.seed)
+        result['worker_rss_mb'] = worker_rss_mb(proc.pid)
+        return result
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='david TTS app benchmark')
+    parser.add_argument('--targets', default='client', help='client,gunicorn')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--stub-latency', type=float, default=0.05, help='stub backend delay per part (s)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workload', default=os.path.join(BASE_DIR, 'input_log.txt'))
+    parser.add_argument('--output', default=None, help='JSON report path')
+    parser.add_argument('--_client', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._client:
+        run_client(args)
+        return
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'config': {k: v for k, v in vars(args).items() if not k.startswith('_')},
+        'results': [],
+    }
+    for target in args.targets.split(','):
+        for scenario in args.scenarios.split(','):
+            with tempfile.TemporaryDirectory() as workdir:
+                try:
+                    if target == 'client':
+                        result = bench_client(scenario, args, workdir)
+                    elif target == 'gunicorn':
+                        result = bench_gunicorn(scenario, args, workdir)
+                    else:
+                        raise ValueError(f'Unknown target: {target}')
+                except Exception as e:
+                    result = {'error': str(e)}
+            result.update(target=target, scenario=scenario)
+            report['results'].append(result)
+            print(f"{target:8} {scenario:15} "
+                  f"{result.get('throughput_rps', '-'):>8} req/s  "
+                  f"p50 {result.get('latency_p50_ms', '-')} ms  p99 {result.get('latency_p99_ms', '-')} ms  "
+                  f"{result.get('bytes_per_response', '-')} B/resp  {result.get('error', '')}")
+
+    output = args.output or f"benchmark_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'Report saved: {output}')
+
+
+if __name__ == '__main__':
+    main()
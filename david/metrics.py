@@ -0,0 +1,205 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    inner = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels)
+    return '{' + inner + '}'
+
+
+def _format_le(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def estimate_quantile(buckets, count, q):
+    # 버킷 누적 개수로 분위수 추정 (버킷 안에서는 선형 보간, Prometheus histogram_quantile 방식)
+    if count == 0:
+        return 0.0
+    rank = q * count
+    lower, seen = 0.0, 0
+    for bound, n in zip(BUCKETS, buckets):
+        if seen + n >= rank and n > 0:
+            if bound == float('inf'):
+                return lower
+            return lower + (bound - lower) * (rank - seen) / n
+        seen += n
+        if bound != float('inf'):
+            lower = bound
+    return lower
+
+
+class Metrics:
+    # 워커(프로세스)별 카운터와 구간 시간 히스토그램
+    def __init__(self, prefix, shared_dir=None, flush_interval=5.0):
+        self.prefix = prefix
+        self.shared_dir = shared_dir
+        self.flush_interval = flush_interval
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.pid = None
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+        self._ensure_writer()
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist['buckets'][i] += 1
+                    break
+            hist['sum'] += seconds
+            hist['count'] += 1
+        self._ensure_writer()
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage)
+
+    def timed_iter(self, stage, chunks):
+        # 조각 스트림: 첫 조각까지 시간과 전체 소요 시간을 따로 기록
+        start = time.perf_counter()
+        first = True
+        try:
+            for chunk in chunks:
+                if first:
+                    self.observe('stage_seconds', time.perf_counter() - start, stage=stage + '_first_chunk')
+                    first = False
+                yield chunk
+        except Exception:
+            self.inc('errors', stage=stage)
+            raise
+        self.observe('stage_seconds', time.perf_counter() - start, stage=stage)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, dict(labels), dict(hist, buckets=list(hist['buckets']))]
+                               for (name, labels), hist in self.histograms.items()],
+            }
+
+    # --- 워커 간 집계: 각 워커가 공유 디렉터리에 스냅샷을 주기적으로 기록 ---
+
+    def _ensure_writer(self):
+        if not self.shared_dir or self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            threading.Thread(target=self._write_loop, name='metrics-writer', daemon=True).start()
+
+    def _write_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.write_snapshot()
+
+    def write_snapshot(self):
+        path = os.path.join(self.shared_dir, f'metrics-{os.getpid()}.json')
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f'Error writing metrics snapshot: {e}')
+
+    def aggregate(self):
+        # 공유 디렉터리의 모든 워커 스냅샷을 합산 (종료된 워커의 누적값도 포함)
+        self.write_snapshot()
+        counters, histograms = {}, {}
+        for path in glob.glob(os.path.join(self.shared_dir, 'metrics-*.json')):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snap = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in snap['counters']:
+                key = _key(name, labels)
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, hist in snap['histograms']:
+                key = _key(name, labels)
+                total = histograms.setdefault(key, {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0})
+                total['buckets'] = [a + b for a, b in zip(total['buckets'], hist['buckets'])]
+                total['sum'] += hist['sum']
+                total['count'] += hist['count']
+        return counters, histograms
+
+    # --- Prometheus 텍스트 형식 ---
+
+    def render(self, gauges=None, aggregate=False):
+        if aggregate and self.shared_dir:
+            counters, histograms = self.aggregate()
+            extra = ()
+        else:
+            with self.lock:
+                counters = dict(self.counters)
+                histograms = {k: dict(v, buckets=list(v['buckets'])) for k, v in self.histograms.items()}
+            extra = (('worker', str(os.getpid())),)
+
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            full = f'{self.prefix}_{name}_total'
+            if full not in typed:
+                lines.append(f'# TYPE {full} counter')
+                typed.add(full)
+            lines.append(f'{full}{_format_labels(labels + extra)} {value}')
+
+        for (name, labels), hist in sorted(histograms.items()):
+            full = f'{self.prefix}_{name}'
+            if full not in typed:
+                lines.append(f'# TYPE {full} histogram')
+                typed.add(full)
+            cumulative = 0
+            for bound, n in zip(BUCKETS, hist['buckets']):
+                cumulative += n
+                le = (('le', _format_le(bound)),)
+                lines.append(f'{full}_bucket{_format_labels(labels + extra + le)} {cumulative}')
+            lines.append(f'{full}_sum{_format_labels(labels + extra)} {hist["sum"]}')
+            lines.append(f'{full}_count{_format_labels(labels + extra)} {hist["count"]}')
+
+        # p50/p95/p99 (버킷 기반 추정값)
+        for (name, labels), hist in sorted(histograms.items()):
+            full = f'{self.prefix}_{name}_quantile'
+            if full not in typed:
+                lines.append(f'# TYPE {full} gauge')
+                typed.add(full)
+            for q in QUANTILES:
+                value = estimate_quantile(hist['buckets'], hist['count'], q)
+                quantile = (('quantile', str(q)),)
+                lines.append(f'{full}{_format_labels(labels + extra + quantile)} {value:.6f}')
+
+        # 캐시/풀 상태 등 이 워커의 현재 값
+        for name, value in sorted((gauges or {}).items()):
+            full = f'{self.prefix}_{name}'
+            lines.append(f'# TYPE {full} gauge')
+            lines.append(f'{full}{_format_labels((("worker", str(os.getpid())),))} {value}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,133 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: 회전 시 파일 잠금 없이 진행
+    fcntl = None
+
+_STOP = object()
+
+
+class RequestLog:
+    # 요청 경로는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 한 번에 기록
+    def __init__(self, path, batch_size=100, flush_interval=1.0, max_bytes=10 * 1024 * 1024,
+                 backup_count=3, per_worker=False, queue_size=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.per_worker = per_worker
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.written = 0
+        self.lock = threading.Lock()
+        self.pid = None
+        self.queue = None
+        self.thread = None
+        atexit.register(self.close)
+
+    def _ensure_thread(self):
+        # gunicorn이 fork한 워커에서는 부모의 스레드가 없으므로 새로 시작
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(maxsize=self.queue_size)
+            self.thread = threading.Thread(target=self._run, name='request-log', daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+
+    def _file_path(self):
+        if self.per_worker:
+            root, ext = os.path.splitext(self.path)
+            return f'{root}.{os.getpid()}{ext}'
+        return self.path
+
+    def log(self, line):
+        # 절대 블로킹하지 않음: 큐가 가득 차면 버리고 개수만 셈
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        data = ''.join(line + '\n' for line in batch).encode('utf-8')
+        path = self._file_path()
+        try:
+            # O_APPEND + write 한 번 -> 워커끼리 배치 단위로 섞이지 않고 줄이 끊기지 않음
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                if os.fstat(fd).st_size > self.max_bytes:
+                    self._rotate(fd, path)
+            finally:
+                os.close(fd)
+            self.written += len(batch)
+        except OSError as e:
+            self.dropped += len(batch)
+            print(f'Error writing request log: {e}')
+
+    def _rotate(self, fd, path):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            # 다른 워커가 먼저 회전했으면 (경로가 이미 새 파일) 건너뜀
+            if os.stat(path).st_ino != os.fstat(fd).st_ino:
+                return
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f'{path}.{i}'
+                if os.path.exists(src):
+                    os.replace(src, f'{path}.{i + 1}')
+            if self.backup_count > 0:
+                os.replace(path, f'{path}.1')
+            else:
+                os.truncate(path, 0)
+        except FileNotFoundError:
+            pass
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def close(self, timeout=5):
+        # 종료 시 남은 항목 기록
+        if self.pid != os.getpid() or not self.thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+    def stats(self):
+        return {
+            'queued': self.queue.qsize() if self.queue else 0,
+            'written': self.written,
+            'dropped': self.dropped,
+        }
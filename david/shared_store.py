@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class SharedAudioStore:
+    # 한 호스트의 gunicorn 워커들이 함께 쓰는 오디오 저장소 (SQLite WAL)
+    # WAL 모드라 읽기는 쓰기를 막지 않고, 쓰기/삭제는 BEGIN IMMEDIATE로 워커 간 직렬화
+    def __init__(self, path, max_bytes, touch_interval=60.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.evictions = 0
+        self.size = 0
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        # size/last_used를 data보다 앞에 두어 LRU 조회 때 BLOB overflow 페이지를 읽지 않음
+        conn.execute('CREATE TABLE IF NOT EXISTS audio ('
+                     'key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_used REAL NOT NULL, data BLOB NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS audio_last_used ON audio(last_used)')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('total_bytes', 0)")
+        self.size = conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+
+    def _conn(self):
+        # sqlite3 연결은 스레드/프로세스마다 따로 (fork 후 부모 연결 재사용 금지)
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute('SELECT data, last_used FROM audio WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        data, last_used = row
+        now = time.time()
+        # 읽을 때마다 쓰면 쓰기 잠금 경쟁이 생기므로 touch_interval마다만 LRU 시각 갱신
+        if now - last_used > self.touch_interval:
+            try:
+                conn.execute('UPDATE audio SET last_used = ? WHERE key = ?', (now, key))
+            except sqlite3.OperationalError:
+                pass  # 잠금 대기 초과: 다음 읽기 때 다시 시도
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT size FROM audio WHERE key = ?', (key,)).fetchone()
+            old_size = row[0] if row else 0
+            conn.execute('INSERT OR REPLACE INTO audio (key, size, last_used, data) VALUES (?, ?, ?, ?)',
+                         (key, len(data), time.time(), sqlite3.Binary(data)))
+            conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_bytes'", (len(data) - old_size,))
+            total = conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+            if total > self.max_bytes:
+                total = self._evict(conn, total)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self.size = total
+
+    def _evict(self, conn, total):
+        # last_used가 가장 오래된 항목부터 삭제 (같은 트랜잭션 안에서 총량 갱신)
+        freed = 0
+        evicted = []
+        for key, size in conn.execute('SELECT key, size FROM audio ORDER BY last_used').fetchall():
+            if total - freed <= self.max_bytes:
+                break
+            evicted.append((key,))
+            freed += size
+        conn.executemany('DELETE FROM audio WHERE key = ?', evicted)
+        conn.execute("UPDATE meta SET value = value - ? WHERE name = 'total_bytes'", (freed,))
+        self.evictions += len(evicted)
+        return total - freed
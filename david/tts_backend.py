@@ -0,0 +1,86 @@
+import time
+
+from gtts import gTTS
+
+# 무음 MP3 프레임: MPEG-1 Layer III, 32kbps, 44.1kHz, mono, CRC 없음
+# 헤더 4바이트 + side info 17바이트(0 -> 데이터 없음) + 나머지 0 = 104바이트, 약 26ms
+SILENT_FRAME = b'\xff\xfb\x10\xc0' + bytes(100)
+FRAME_SECONDS = 1152 / 44100
+
+
+class GTTSBackend:
+    name = 'gtts'
+
+    def stream(self, text, lang):
+        # gTTS가 받아오는 MP3 조각을 그대로 흘려보냄
+        return gTTS(text=text, lang=lang).stream()
+
+
+class StubBackend:
+    # 부하 테스트용: 구글 없이 텍스트 길이에 비례하는 무음 MP3를 만듦 (같은 입력 -> 같은 출력)
+    name = 'stub'
+
+    def __init__(self, latency=0.0, ms_per_char=60, part_chars=100):
+        self.latency = latency
+        self.ms_per_char = ms_per_char
+        self.part_chars = part_chars
+
+    def stream(self, text, lang):
+        # gTTS처럼 part_chars자마다 한 번씩 왕복 지연 후 조각을 내보냄
+        for start in range(0, max(len(text), 1), self.part_chars):
+            part = text[start:start + self.part_chars]
+            if self.latency:
+                time.sleep(self.latency)
+            frames = max(1, round(len(part) * self.ms_per_char / 1000 / FRAME_SECONDS))
+            yield SILENT_FRAME * frames
+
+
+class BackendStream:
+    # 실제로 사용한 백엔드 정보가 붙은 조각 스트림
+    def __init__(self, backend, first, rest, cacheable):
+        self.backend = backend
+        self.first = first
+        self.rest = rest
+        self.cacheable = cacheable
+
+    def __iter__(self):
+        yield self.first
+        yield from self.rest
+
+
+class FallbackBackend:
+    # 앞의 백엔드가 첫 조각을 내기 전에 실패하면 다음 백엔드로 넘어감
+    def __init__(self, backends):
+        self.backends = backends
+        self.name = ','.join(backend.name for backend in backends)
+        self.fallbacks = 0
+
+    def stream(self, text, lang):
+        error = None
+        for index, backend in enumerate(self.backends):
+            try:
+                chunks = iter(backend.stream(text, lang))
+                first = next(chunks, b'')
+            except Exception as e:
+                error = e
+                self.fallbacks += 1
+                continue
+            # 대체 백엔드의 결과는 캐시하지 않음 (장애 중 만든 오디오가 계속 남지 않도록)
+            return BackendStream(backend, first, chunks, cacheable=(index == 0))
+        raise error
+
+
+def create_backend(spec, stub_latency=0.0, stub_ms_per_char=60):
+    # 'gtts', 'stub', 'gtts,stub' (앞에서부터 시도) 형식
+    backends = []
+    for name in spec.split(','):
+        name = name.strip()
+        if name == 'gtts':
+            backends.append(GTTSBackend())
+        elif name == 'stub':
+            backends.append(StubBackend(stub_latency, stub_ms_per_char))
+        else:
+            raise ValueError(f'Unknown TTS backend: {name}')
+    if len(backends) == 1:
+        return backends[0]
+    return FallbackBackend(backends)
@@ -0,0 +1,86 @@
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class ZipStream:
+    # zipfile이 쓰는 출력 버퍼 (seek 불가 -> zipfile이 data descriptor 방식으로 기록)
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+
+    def write(self, data):
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def parse_items(payload, valid_languages, max_items):
+    # (항목 목록, 오류 메시지) 반환. 항목별 오류는 항목에 담아 manifest로 보고
+    if isinstance(payload, dict):
+        payload = payload.get('items')
+    if not isinstance(payload, list) or not payload:
+        return None, 'JSON 목록 [{"text": ..., "lang": ...}, ...] 을 보내세요.'
+    if len(payload) > max_items:
+        return None, f'한 번에 최대 {max_items}개까지 요청할 수 있습니다.'
+
+    items = []
+    for index, raw in enumerate(payload):
+        item = {'index': index, 'text': None, 'lang': None, 'error': None}
+        if not isinstance(raw, dict):
+            item['error'] = '항목은 {"text": ..., "lang": ...} 형식이어야 합니다.'
+        else:
+            item['text'] = raw.get('text')
+            item['lang'] = raw.get('lang', 'ko')
+            if item['lang'] not in valid_languages:
+                item['error'] = '유효하지 않은 언어입니다.'
+            elif not isinstance(item['text'], str) or not item['text'].strip():
+                item['error'] = '텍스트를 입력하세요.'
+        items.append(item)
+    return items, None
+
+
+def stream_zip(items, fetch_audio, parallelism):
+    # 완료되는 순서대로 MP3를 ZIP 항목으로 내보내고, 마지막에 manifest.json 추가
+    out = ZipStream()
+    archive = zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_STORED)
+    executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='tts-batch')
+    try:
+        futures = {
+            executor.submit(fetch_audio, item['text'], item['lang']): item
+            for item in items if item['error'] is None
+        }
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                audio = future.result()
+            except Exception as e:
+                item['error'] = f'오류 발생: {str(e)}'
+                continue
+            item['file'] = f"{item['index']:04d}_{item['lang']}.mp3"
+            item['bytes'] = len(audio)
+            archive.writestr(item['file'], audio)
+            yield out.pop()
+
+        manifest = {
+            'ok': sum(1 for item in items if item['error'] is None),
+            'failed': sum(1 for item in items if item['error'] is not None),
+            'items': items,
+        }
+        archive.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+        archive.close()
+        yield out.pop()
+    finally:
+        # 클라이언트가 중간에 끊으면 남은 작업 취소
+        executor.shutdown(wait=False, cancel_futures=True)
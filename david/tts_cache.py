@@ -0,0 +1,247 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    # 같은 문장이 공백/유니코드 조합 차이로 다른 키가 되지 않도록 정규화
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def cache_key(text, lang):
+    # (정규화된 텍스트, 언어) 내용 해시 -> 캐시 키
+    raw = f'{lang}\x00{normalize_text(text)}'.encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()
+
+
+class MemoryCache:
+    # 프로세스 내부 LRU (바이트 용량 제한)
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            data = self.items.get(key)
+            if data is not None:
+                self.items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+
+class DiskCache:
+    # 앱 디렉터리 아래 파일 캐시 (용량 초과 시 오래 안 쓴 파일부터 삭제)
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.mp3')
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.mp3'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # 다른 워커가 방금 삭제
+            entries.append((name, st.st_size, st.st_mtime))
+        return entries
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # LRU 순서를 위해 접근 시각 갱신
+            return data
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        # 임시 파일에 쓰고 rename -> 다른 워커가 반쯤 쓴 파일을 읽지 않음
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                old_size = os.path.getsize(self._path(key))  # 덮어쓰기면 기존 크기만큼 빼야 함
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self.lock:
+            self.size += len(data) - old_size
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # 여러 워커가 같은 디렉터리를 쓰므로 실제 크기를 다시 계산
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self.size = sum(size for _, size, _ in entries)
+        for name, size, _ in entries:
+            if self.size <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            self.size -= size
+            self.evictions += 1
+
+
+class AudioCache:
+    # 2단 캐시: 메모리 LRU -> 디스크(DiskCache 또는 SharedAudioStore) -> (miss) 합성
+    def __init__(self, memory_bytes, disk=None):
+        self.memory = MemoryCache(memory_bytes)
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # 요청 스레드들이 동시에 카운터를 올림
+
+    def get(self, key, count=True):
+        # count=False: 요청 단위 hit/miss 통계에 넣지 않는 내부 조회 (긴 텍스트의 문장 조각 등)
+        data = self.memory.get(key)
+        if data is not None:
+            if count:
+                self._count(hits=1)
+            return data
+        if self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                if count:
+                    self._count(hits=1, disk_hits=1)
+                self.memory.put(key, data)  # 디스크 hit는 메모리로 승격
+                return data
+        if count:
+            self._count(misses=1)
+        return None
+
+    def _count(self, hits=0, disk_hits=0, misses=0):
+        with self.lock:
+            self.hits += hits
+            self.disk_hits += disk_hits
+            self.misses += misses
+
+    def put(self, key, data):
+        self.memory.put(key, data)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, data)
+            except Exception:
+                pass  # 디스크 캐시는 실패해도 응답에는 영향 없음
+
+    def stats(self):
+        with self.lock:
+            hits, disk_hits, misses = self.hits, self.disk_hits, self.misses
+        return {
+            'hits': hits,
+            'disk_hits': disk_hits,
+            'misses': misses,
+            'memory_items': len(self.memory.items),
+            'memory_bytes': self.memory.size,
+            'memory_evictions': self.memory.evictions,
+            'disk_bytes': self.disk.size if self.disk else 0,
+            'disk_evictions': self.disk.evictions if self.disk else 0,
+        }
+
+
+class TextStore:
+    # 키 -> (텍스트, 언어). 페이지에는 짧은 /tts/<key>.mp3 URL만 넣고 텍스트는 여기서 찾음
+    # directory를 주면 같은 호스트의 워커들이 공유 (폼 POST와 오디오 GET이 다른 워커로 갈 수 있음)
+    def __init__(self, directory=None, max_items=10000, max_age=86400):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_age = max_age
+        self.items = OrderedDict()
+        self.puts = 0
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.txt')
+
+    def get(self, key):
+        with self.lock:
+            entry = self.items.get(key)
+            if entry is not None:
+                self.items.move_to_end(key)
+                return entry
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                lang, text = f.read().split('\n', 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        self._remember(key, (text, lang))
+        return text, lang
+
+    def put(self, key, text, lang):
+        self._remember(key, (text, lang))
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.utime(path)  # 이미 있으면 만료 시각만 늦춤
+        except FileNotFoundError:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(f'{lang}\n{text}')
+            os.replace(tmp_path, path)
+        with self.lock:
+            self.puts += 1
+            prune = self.puts % 1000 == 0
+        if prune:
+            self._prune()
+
+    def _remember(self, key, entry):
+        with self.lock:
+            self.items[key] = entry
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+
+    def _prune(self):
+        # max_age 동안 다시 쓰이지 않은 텍스트 파일 삭제
+        cutoff = time.time() - self.max_age
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
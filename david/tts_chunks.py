@@ -0,0 +1,41 @@
+import re
+
+# 문장 끝: 라틴 문장부호 + 공백, 또는 전각 문장부호 (뒤에 공백이 없어도 됨)
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|(?<=[。！？])\s*')
+
+
+def split_sentences(text, max_chars):
+    # 문장 단위로 나누고, 짧은 문장은 max_chars까지 이어 붙임
+    pieces = []
+    current = ''
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        # 한 문장이 너무 길면 공백(없으면 글자 수) 기준으로 자름
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f'{current} {sentence}' if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def strip_id3v2(data):
+    # 이어 붙일 때 두 번째 조각부터는 앞쪽 ID3v2 태그를 떼어 MP3 프레임만 남김
+    if len(data) < 10 or data[:3] != b'ID3':
+        return data
+    size = (data[6] & 0x7f) << 21 | (data[7] & 0x7f) << 14 | (data[8] & 0x7f) << 7 | (data[9] & 0x7f)
+    footer = 10 if data[5] & 0x10 else 0
+    return data[10 + size + footer:]
@@ -0,0 +1,114 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PoolBusy(Exception):
+    # 대기 시간 안에 합성 슬롯을 얻지 못함
+    pass
+
+
+class Flight:
+    # 진행 중인 합성 1건. 같은 (text, lang) 요청들이 이 결과를 함께 기다림
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.cacheable = True
+        self.cond = threading.Condition()
+
+    def feed(self, chunks):
+        # 풀 스레드에서 실행: 받은 조각을 쌓고 기다리는 요청들을 깨움
+        try:
+            for chunk in chunks:
+                with self.cond:
+                    self.chunks.append(chunk)
+                    self.cond.notify_all()
+        except Exception as e:
+            self.fail(e)
+        finally:
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+    def fail(self, error):
+        with self.cond:
+            self.error = error
+            self.done = True
+            self.cond.notify_all()
+
+    def iter_chunks(self, timeout):
+        # 나중에 합류한 요청도 처음 조각부터 받음 (timeout은 조각 하나당 대기 시간)
+        i = 0
+        while True:
+            with self.cond:
+                if not self.cond.wait_for(lambda: i < len(self.chunks) or self.done, timeout):
+                    raise TimeoutError('합성 응답 대기 시간 초과')
+                if i < len(self.chunks):
+                    chunk = self.chunks[i]
+                    i += 1
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            yield chunk
+
+
+class SynthesisPool:
+    # 동시 합성 수를 max_workers로 제한하고, 같은 키의 동시 요청은 하나로 합침
+    def __init__(self, max_workers, queue_timeout):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts')
+        self.slots = threading.BoundedSemaphore(max_workers)
+        self.queue_timeout = queue_timeout
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.started = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def flight(self, key, stream_fn, *args, on_done=None):
+        with self.lock:
+            flight = self.inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight
+            flight = Flight()
+            self.inflight[key] = flight
+
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            with self.lock:
+                self.inflight.pop(key, None)
+                self.rejected += 1
+            error = PoolBusy('합성 대기열이 가득 찼습니다.')
+            flight.fail(error)  # 그 사이 합류한 요청도 같은 오류를 받음
+            raise error
+
+        with self.lock:
+            self.started += 1
+        self.executor.submit(self._run, key, flight, stream_fn, args, on_done)
+        return flight
+
+    def _run(self, key, flight, stream_fn, args, on_done):
+        try:
+            try:
+                chunks = stream_fn(*args)
+            except Exception as e:
+                flight.fail(e)
+            else:
+                # 대체 백엔드 결과처럼 cacheable=False인 스트림은 on_done(캐시 저장)을 건너뜀
+                flight.cacheable = getattr(chunks, 'cacheable', True)
+                flight.feed(chunks)
+            if flight.error is None and flight.cacheable and on_done is not None:
+                on_done(b''.join(flight.chunks))
+        finally:
+            # 캐시에 넣은 뒤 inflight에서 제거 -> 이후 요청은 캐시 hit
+            with self.lock:
+                self.inflight.pop(key, None)
+            self.slots.release()
+
+    def stats(self):
+        return {
+            'inflight': len(self.inflight),
+            'started': self.started,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+        }
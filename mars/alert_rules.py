@@ -0,0 +1,131 @@
+import json
+import time
+
+import numpy as np
+
+from mission_sinks import SENSOR_FIELDS
+
+# 설정 파일(JSON)의 경보 규칙을 한 번 NumPy 배열로 컴파일해, 읽은 값 배치 전체를 규칙 전체에 대해 한 번에 검사
+# 규칙 종류
+#   threshold : 현재 값
+#   rate      : 직전 값 대비 초당 변화량. 초는 호출자가 넘기는 센서 시간 기준
+#               (fleet_sim은 seq * 센서 주기, MissionComputer는 interval_scale로 보정한 시각)
+#   window_avg: 최근 window개 값의 평균 (window개가 모이기 전에는 판정하지 않음)
+# 히스테리시스: 'value'를 넘으면 발생(raised), 'clear' 안쪽으로 돌아와야 해제(cleared) -> 경계에서 경보가 반복되지 않음
+# 배치는 (스트림 수, 지표 수) 배열: MissionComputer 하나면 1행, 기지 N개(fleet_sim)면 N행
+
+RULE_TYPES = ('threshold', 'rate', 'window_avg')
+
+
+def load_rules(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['rules']
+
+
+class AlertEngine:
+    def __init__(self, rules, streams=1, metrics=SENSOR_FIELDS):
+        self.metrics = list(metrics)
+        self.streams = streams
+        self.rules = list(rules)
+        for rule in self.rules:
+            if rule['type'] not in RULE_TYPES:
+                raise ValueError(f"{rule['name']}: unknown rule type {rule['type']}")
+            if rule['op'] not in ('>', '<'):
+                raise ValueError(f"{rule['name']}: op must be '>' or '<'")
+            if rule['metric'] not in self.metrics:
+                raise ValueError(f"{rule['name']}: unknown metric {rule['metric']}")
+
+        # 규칙별 배열. '<' 규칙은 부호를 뒤집어 모두 '크면 발생' 형태로 통일
+        self.names = [rule['name'] for rule in self.rules]
+        self.metric_index = np.array([self.metrics.index(rule['metric']) for rule in self.rules], dtype=np.intp)
+        self.sign = np.array([1.0 if rule['op'] == '>' else -1.0 for rule in self.rules])
+        self.trigger = self.sign * np.array([rule['value'] for rule in self.rules], dtype=np.float64)
+        self.clear = self.sign * np.array([rule.get('clear', rule['value']) for rule in self.rules], dtype=np.float64)
+        kinds = np.array([rule['type'] for rule in self.rules])
+        self.is_rate = kinds == 'rate'
+        self.is_window = kinds == 'window_avg'
+        # 창 길이별로 묶음: {window: 규칙 번호 배열}
+        self.windows = {}
+        for i, rule in enumerate(self.rules):
+            if rule['type'] == 'window_avg':
+                self.windows.setdefault(int(rule['window']), []).append(i)
+        self.windows = {w: np.array(idx, dtype=np.intp) for w, idx in self.windows.items()}
+        self.history_size = max(self.windows, default=1)
+        self.reset()
+
+    def reset(self):
+        metrics = len(self.metrics)
+        self.active = np.zeros((self.streams, len(self.rules)), dtype=bool)
+        self.prev_values = None
+        self.prev_ts = None
+        # 창 평균용 링 버퍼 (history_size, 스트림, 지표)
+        self.history = np.full((self.history_size, self.streams, metrics), np.nan)
+        self.head = 0
+        self.raised = 0
+        self.cleared = 0
+
+    def measure(self, values, ts):
+        # (스트림, 규칙) 측정값: threshold는 그대로, rate는 초당 변화량, window_avg는 창 평균
+        current = values[:, self.metric_index]
+        measured = current.copy()
+        if self.is_rate.any():
+            if self.prev_values is None or ts <= self.prev_ts:
+                rate = np.full_like(current, np.nan)
+            else:
+                rate = (current - self.prev_values[:, self.metric_index]) / (ts - self.prev_ts)
+            measured[:, self.is_rate] = rate[:, self.is_rate]
+        self.prev_values = values.copy()
+        self.prev_ts = ts
+
+        if self.windows:
+            self.history[self.head] = values
+            self.head = (self.head + 1) % self.history_size
+            for window, rules in self.windows.items():
+                recent = (self.head - 1 - np.arange(window)) % self.history_size
+                averages = self.history[recent].mean(axis=0)  # NaN이 남아 있으면 (창이 덜 참) NaN
+                measured[:, rules] = averages[:, self.metric_index[rules]]
+        return measured
+
+    def update(self, values, ts=None):
+        # 벡터 판정만: 새로 발생/해제된 (스트림, 규칙) 마스크와 측정값 반환 (이벤트 dict를 만들지 않음)
+        if isinstance(values, dict):
+            values = np.array([[float(values.get(name, np.nan)) for name in self.metrics]])
+        values = np.asarray(values, dtype=np.float64)
+        ts = ts if ts is not None else time.time()
+        measured = self.measure(values, ts)
+        signed = measured * self.sign
+        # NaN 비교는 항상 False -> 판정 불가면 상태 유지
+        fire = signed > self.trigger
+        release = signed < self.clear
+        active = np.where(self.active, ~release, fire)
+        raised = active & ~self.active
+        cleared = self.active & ~active
+        self.active = active
+        self.raised += int(raised.sum())
+        self.cleared += int(cleared.sum())
+        return raised, cleared, measured
+
+    def evaluate(self, values, ts=None):
+        # values: (스트림, 지표) 또는 지표 dict(스트림 1개). 상태가 바뀐 (스트림, 규칙)만 이벤트로 반환
+        raised, cleared, measured = self.update(values, ts)
+        events = []
+        for stream, rule in zip(*np.nonzero(raised | cleared)):
+            events.append({
+                'stream': int(stream),
+                'rule': self.names[rule],
+                'type': self.rules[rule]['type'],
+                'metric': self.rules[rule]['metric'],
+                'state': 'raised' if raised[stream, rule] else 'cleared',
+                'value': round(float(measured[stream, rule]), 4),
+                'threshold': self.rules[rule]['value'],
+            })
+        return events
+
+    def stats(self):
+        return {
+            'rules': len(self.rules),
+            'streams': self.streams,
+            'raised': self.raised,
+            'cleared': self.cleared,
+            'active': int(self.active.sum()),
+        }
@@ -0,0 +1,215 @@
+import argparse
+import json
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from alert_rules import AlertEngine, load_rules
+from mission_sinks import SENSOR_FIELDS
+
+# 화성 기지 N개의 DummySensor 값을 NumPy 배치로 한꺼번에 생성
+# 기지들을 샤드로 나눠 프로세스마다 생성하고, 공유 메모리 링 버퍼를 통해 집계 프로세스가 pickling 없이 읽음
+# 사용 예) python fleet_sim.py --bases 10000 --shards 4 --duration 10
+
+# 배치 하나가 나타내는 센서 시간(초) = MissionComputer의 SENSOR_PERIOD
+# 링의 타임스탬프는 벽시계가 아니라 seq * sample_period (경보 rate 규칙이 생성 속도와 무관하게 같은 의미)
+SAMPLE_PERIOD = 5.0
+
+
+class DummyFleet:
+    # DummySensor.set_env와 같은 범위의 값을 기지 n개분 (n, 6) 배열로 생성
+    def __init__(self, bases, seed=None):
+        self.bases = bases
+        self.rng = np.random.default_rng(seed)
+        self.env_values = np.zeros((bases, len(SENSOR_FIELDS)))
+
+    def set_env(self, out=None):
+        out = self.env_values if out is None else out
+        n, rng = len(out), self.rng
+        out[:, 0] = rng.integers(18, 31, n)     # 내부 온도
+        out[:, 1] = rng.integers(0, 22, n)      # 외부 온도
+        out[:, 2] = rng.integers(50, 61, n)     # 내부 습도
+        out[:, 3] = rng.integers(500, 716, n)   # 외부 광량
+        out[:, 4] = np.round(rng.uniform(0.02, 0.1, n), 2)  # 내부 CO2
+        out[:, 5] = np.round(rng.uniform(4, 7, n), 2)       # 내부 산소
+        return out
+
+    def get_env(self):
+        return self.env_values
+
+
+class FleetRing:
+    # 샤드마다 단일 생산자/단일 소비자 링 버퍼 하나. 모두 공유 메모리 블록 하나에 배치
+    # header[s] = [write_seq, read_seq], header[-1, 0] = 정지 플래그
+    def __init__(self, shm, shards, capacity, shard_bases):
+        self.shm = shm
+        self.shards = shards
+        self.capacity = capacity
+        self.shard_bases = shard_bases
+        header_bytes = (shards + 1) * 2 * 8
+        ts_bytes = shards * capacity * 8
+        self.header = np.ndarray((shards + 1, 2), dtype=np.int64, buffer=shm.buf)
+        self.timestamps = np.ndarray((shards, capacity), dtype=np.float64, buffer=shm.buf, offset=header_bytes)
+        self.data = np.ndarray((shards, capacity, shard_bases, len(SENSOR_FIELDS)), dtype=np.float64,
+                               buffer=shm.buf, offset=header_bytes + ts_bytes)
+
+    @staticmethod
+    def size(shards, capacity, shard_bases):
+        return ((shards + 1) * 2 + shards * capacity + shards * capacity * shard_bases * len(SENSOR_FIELDS)) * 8
+
+    @classmethod
+    def create(cls, shards, capacity, shard_bases):
+        shm = shared_memory.SharedMemory(create=True, size=cls.size(shards, capacity, shard_bases))
+        ring = cls(shm, shards, capacity, shard_bases)
+        ring.header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, shards, capacity, shard_bases):
+        return cls(shared_memory.SharedMemory(name=name), shards, capacity, shard_bases)
+
+    @property
+    def stopped(self):
+        return self.header[-1, 0] != 0
+
+    def stop(self):
+        self.header[-1, 0] = 1
+
+    def close(self):
+        # ndarray 뷰를 먼저 놓아야 공유 메모리를 닫을 수 있음
+        self.header = self.timestamps = self.data = None
+        self.shm.close()
+
+
+def _producer(name, shards, capacity, shard_bases, shard, bases, seed, interval, sample_period):
+    ring = FleetRing.attach(name, shards, capacity, shard_bases)
+    fleet = DummyFleet(bases, seed)
+    seq = 0
+    next_tick = time.monotonic()
+    try:
+        while not ring.stopped:
+            # 소비자가 따라오지 못하면 (링이 가득 참) 잠깐 대기
+            if seq - ring.header[shard, 1] >= capacity:
+                time.sleep(0.0005)
+                continue
+            slot = seq % capacity
+            fleet.set_env(ring.data[shard, slot, :bases])  # 공유 메모리에 직접 생성
+            ring.timestamps[shard, slot] = seq * sample_period
+            seq += 1
+            ring.header[shard, 0] = seq  # 데이터를 다 쓴 뒤 공개
+            if interval:
+                next_tick += interval
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        ring.close()
+
+
+def _aggregator(name, shards, capacity, shard_bases, counts, results, rules=None):
+    ring = FleetRing.attach(name, shards, capacity, shard_bases)
+    # 샤드마다 경보 엔진 하나 (스트림 = 샤드의 기지 수), 배치 전체를 한 번에 검사
+    engines = [AlertEngine(rules, streams=count) for count in counts] if rules else None
+    samples = 0
+    batches = 0
+    sums = np.zeros(len(SENSOR_FIELDS))
+    mins = np.full(len(SENSOR_FIELDS), np.inf)
+    maxs = np.full(len(SENSOR_FIELDS), -np.inf)
+    first = last = None
+    try:
+        while True:
+            stopped = ring.stopped
+            idle = True
+            for shard in range(shards):
+                write_seq = int(ring.header[shard, 0])
+                read_seq = int(ring.header[shard, 1])
+                while read_seq < write_seq:
+                    batch = ring.data[shard, read_seq % capacity, :counts[shard]]  # 복사 없는 뷰
+                    sums += batch.sum(axis=0)
+                    np.minimum(mins, batch.min(axis=0), out=mins)
+                    np.maximum(maxs, batch.max(axis=0), out=maxs)
+                    if engines:
+                        engines[shard].update(batch, float(ring.timestamps[shard, read_seq % capacity]))
+                    samples += len(batch)
+                    batches += 1
+                    read_seq += 1
+                    ring.header[shard, 1] = read_seq
+                    idle = False
+                    now = time.monotonic()
+                    first = first if first is not None else now
+                    last = now
+            if stopped and idle:
+                break
+            if idle:
+                time.sleep(0.0005)
+    finally:
+        ring.close()
+    elapsed = (last - first) if first is not None and last > first else 0.0
+    report = {
+        'samples': samples,
+        'batches': batches,
+        'elapsed_s': round(elapsed, 3),
+        'samples_per_sec': round(samples / elapsed, 1) if elapsed else 0.0,
+        'fleet_mean': {f: round(float(v), 3) for f, v in zip(SENSOR_FIELDS, sums / max(samples, 1))},
+        'fleet_min': {f: float(v) for f, v in zip(SENSOR_FIELDS, mins)},
+        'fleet_max': {f: float(v) for f, v in zip(SENSOR_FIELDS, maxs)},
+    }
+    if engines:
+        report['alerts'] = {
+            'raised': sum(e.raised for e in engines),
+            'cleared': sum(e.cleared for e in engines),
+            'active': sum(int(e.active.sum()) for e in engines),
+        }
+    results.put(report)
+
+
+def run_fleet(bases=10000, shards=4, duration=10.0, interval=0.0, capacity=8, seed=0, rules=None,
+              sample_period=SAMPLE_PERIOD):
+    # interval=0이면 최대 속도, 아니면 샤드마다 interval초에 한 배치 (실제 센서 주기는 5초)
+    shards = max(1, min(shards, bases))
+    counts = [bases // shards + (1 if i < bases % shards else 0) for i in range(shards)]
+    shard_bases = max(counts)
+    ring = FleetRing.create(shards, capacity, shard_bases)
+    results = multiprocessing.Queue()
+    args = (ring.shm.name, shards, capacity, shard_bases)
+    producers = [
+        multiprocessing.Process(target=_producer, args=args + (i, counts[i], seed + i, interval, sample_period))
+        for i in range(shards)
+    ]
+    aggregator = multiprocessing.Process(target=_aggregator, args=args + (counts, results, rules))
+    try:
+        aggregator.start()
+        for p in producers:
+            p.start()
+        time.sleep(duration)
+        ring.stop()
+        for p in producers:
+            p.join()
+        report = results.get(timeout=30)
+        aggregator.join()
+    finally:
+        ring.stop()
+        for p in producers + [aggregator]:
+            if p.is_alive():
+                p.terminate()
+        shm = ring.shm
+        ring.close()
+        shm.unlink()
+    report.update(bases=bases, shards=shards, duration_s=duration, interval_s=interval)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulate a fleet of mars bases')
+    parser.add_argument('--bases', type=int, default=10000)
+    parser.add_argument('--shards', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--interval', type=float, default=0.0, help='seconds between batches per shard (0 = as fast as possible)')
+    parser.add_argument('--capacity', type=int, default=8, help='ring slots per shard')
+    parser.add_argument('--rules', help='alert rules JSON (e.g. alert_rules.json)')
+    args = parser.parse_args()
+    rules = load_rules(args.rules) if args.rules else None
+    report = run_fleet(args.bases, args.shards, args.duration, args.interval, args.capacity, rules=rules)
+    print(json.dumps(report, indent=4))
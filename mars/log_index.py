@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import os
+import struct
+import sys
+
+import numpy as np
+
+from mission_log import LOG_PATH, HEADER, parse_line, parse_timestamp
+
+# mission_computer_main.log 옆의 시간 인덱스 파일('{로그}.tidx')
+# 줄의 시간 버킷(bucket_seconds 단위)이 바뀔 때마다 (버킷 시작 epoch, 바이트 오프셋)을 하나 기록
+# -> 한 항목부터 다음 항목 전까지(span)의 줄은 모두 같은 버킷. 조회는 겹치는 span만 seek해서 읽음
+# 로그에 줄이 추가되면 마지막으로 색인한 위치부터 이어서 색인 (로그가 잘리거나 바뀌면 새로 만듦)
+# 사용 예) python log_index.py --from "2023-08-27 11:30:00" --to "2023-08-27 11:45:00"
+#         python log_index.py --from "2023-08-27 11:00:00" --event ERROR,WARNING
+
+# magic, version, bucket_seconds, monotonic, entries, indexed_bytes, last_bucket, fingerprint 길이, fingerprint
+INDEX_HEADER = struct.Struct('<4sIIIQQqI16s')
+INDEX_ENTRY = struct.Struct('<qQ')
+MAGIC = b'MLTI'
+VERSION = 1
+FINGERPRINT_BYTES = 64
+
+
+def fingerprint(path, length):
+    # 로그 앞부분 해시: 같은 파일에 이어 쓰는 중인지, 교체/회전되었는지 구분
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(length), digest_size=16).digest()
+
+
+class TimeIndex:
+    def __init__(self, log_path=LOG_PATH, bucket_seconds=60, index_path=None):
+        self.log_path = log_path
+        self.index_path = index_path or f'{log_path}.tidx'
+        self.bucket_seconds = bucket_seconds
+        self.reset()
+
+    def reset(self):
+        self.monotonic = True
+        self.indexed_bytes = 0
+        self.last_bucket = None
+        self.fingerprint_len = 0
+        self.fingerprint = b''
+        self.buckets = np.zeros(0, dtype=np.int64)
+        self.offsets = np.zeros(0, dtype=np.uint64)
+
+    def load(self):
+        # 헤더가 가리키는 항목 수만큼만 읽음 (항목을 쓰다가 죽어 남은 꼬리는 무시)
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, 'rb') as f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                return False
+            magic, version, bucket_seconds, monotonic, entries, indexed_bytes, last_bucket, fp_len, fp = \
+                INDEX_HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or bucket_seconds != self.bucket_seconds:
+                return False
+            data = np.frombuffer(f.read(entries * INDEX_ENTRY.size), dtype=np.dtype([('bucket', '<i8'), ('offset', '<u8')]))
+        if len(data) != entries:
+            return False
+        self.monotonic = bool(monotonic)
+        self.indexed_bytes = indexed_bytes
+        self.last_bucket = last_bucket if entries else None
+        self.fingerprint_len = fp_len
+        self.fingerprint = fp
+        self.buckets = data['bucket'].astype(np.int64)
+        self.offsets = data['offset'].astype(np.uint64)
+        return True
+
+    def _write_header(self, f):
+        f.seek(0)
+        f.write(INDEX_HEADER.pack(MAGIC, VERSION, self.bucket_seconds, int(self.monotonic), len(self.buckets),
+                                  self.indexed_bytes, self.last_bucket if self.last_bucket is not None else 0,
+                                  self.fingerprint_len, self.fingerprint))
+
+    def _valid_for_log(self, size):
+        if size < self.indexed_bytes:
+            return False
+        return self.fingerprint_len == 0 or fingerprint(self.log_path, self.fingerprint_len) == self.fingerprint
+
+    def update(self, rebuild=False):
+        # 새로 추가된 완전한 줄만 색인 (끝에 쓰는 중인 줄은 다음 update에서)
+        size = os.path.getsize(self.log_path)
+        if rebuild or not self.load() or not self._valid_for_log(size):
+            self.reset()
+            rebuild = True
+        if not rebuild and self.indexed_bytes == size:
+            return 0
+
+        new_buckets = []
+        new_offsets = []
+        offset = self.indexed_bytes
+        last_bucket = self.last_bucket
+        monotonic = self.monotonic
+        previous_ts = None
+        previous_epoch = None
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                # 같은 시각 문자열이 이어지면 다시 파싱하지 않음
+                timestamp = raw.split(b',', 1)[0]
+                if timestamp != previous_ts:
+                    previous_ts = timestamp
+                    try:
+                        previous_epoch = parse_timestamp(timestamp.decode('utf-8')) if b',' in raw else None
+                    except (ValueError, UnicodeDecodeError):
+                        previous_epoch = None  # 헤더/형식이 다른 줄은 현재 span에 포함
+                if previous_epoch is not None:
+                    bucket = previous_epoch - previous_epoch % self.bucket_seconds
+                    if bucket != last_bucket:
+                        if last_bucket is not None and bucket < last_bucket:
+                            monotonic = False
+                        new_buckets.append(bucket)
+                        new_offsets.append(offset)
+                        last_bucket = bucket
+                offset += len(raw)
+
+        self.buckets = np.concatenate((self.buckets, np.array(new_buckets, dtype=np.int64)))
+        self.offsets = np.concatenate((self.offsets, np.array(new_offsets, dtype=np.uint64)))
+        self.indexed_bytes = offset
+        self.last_bucket = last_bucket
+        self.monotonic = monotonic
+        if self.fingerprint_len < FINGERPRINT_BYTES:
+            self.fingerprint_len = min(FINGERPRINT_BYTES, offset)
+            self.fingerprint = fingerprint(self.log_path, self.fingerprint_len)
+
+        # 항목을 먼저 덧붙이고 헤더(항목 수/색인 위치)는 마지막에 갱신
+        entries = np.empty(len(new_buckets), dtype=np.dtype([('bucket', '<i8'), ('offset', '<u8')]))
+        entries['bucket'] = new_buckets
+        entries['offset'] = new_offsets
+        mode = 'r+b' if not rebuild and os.path.exists(self.index_path) else 'w+b'
+        with open(self.index_path, mode) as f:
+            if mode == 'w+b':
+                self._write_header(f)
+            f.seek(INDEX_HEADER.size + (len(self.buckets) - len(entries)) * INDEX_ENTRY.size)
+            f.write(entries.tobytes())
+            f.truncate()
+            self._write_header(f)
+        return len(new_buckets)
+
+    def spans(self, start=None, end=None):
+        # [start, end] 시간 범위와 겹치는 (시작 오프셋, 끝 오프셋) 목록, 이어지는 span은 합침
+        # 아직 색인하지 않은 꼬리(줄바꿈 없는 마지막 줄 등)는 항상 포함
+        first_offset = 0 if not len(self.offsets) else int(self.offsets[0])
+        bounds = np.append(self.offsets, np.uint64(self.indexed_bytes)).astype(np.int64)
+        lo = -np.inf if start is None else start - start % self.bucket_seconds
+        hi = np.inf if end is None else end
+        if self.monotonic:
+            # 버킷이 정렬되어 있으면 이분 탐색 두 번 -> O(log n)
+            i = int(np.searchsorted(self.buckets, lo, side='left')) if start is not None else 0
+            j = int(np.searchsorted(self.buckets, hi, side='right')) if end is not None else len(self.buckets)
+            selected = [(i, j)] if j > i else []
+        else:
+            matched = np.flatnonzero((self.buckets >= lo) & (self.buckets <= hi))
+            selected = [(k, k + 1) for k in matched]
+        result = []
+        if start is None and first_offset > 0:
+            result.append([0, first_offset])  # 첫 시각 이전의 줄 (헤더 등)
+        for k, next_k in selected:
+            span_start, span_end = int(bounds[k]), int(bounds[next_k])
+            if result and result[-1][1] == span_start:
+                result[-1][1] = span_end
+            else:
+                result.append([span_start, span_end])
+        size = os.path.getsize(self.log_path)
+        if size > self.indexed_bytes:
+            if result and result[-1][1] == self.indexed_bytes:
+                result[-1][1] = size
+            else:
+                result.append([self.indexed_bytes, size])
+        return [tuple(span) for span in result]
+
+    def query(self, start=None, end=None, events=None):
+        # 범위 안의 줄만 (오프셋, 줄)로. events는 {'INFO', 'ERROR', ...}
+        events = {event.upper() for event in events} if events else None
+        with open(self.log_path, 'rb') as f:
+            for span_start, span_end in self.spans(start, end):
+                f.seek(span_start)
+                offset = span_start
+                while offset < span_end:
+                    raw = f.readline()
+                    if not raw:
+                        break
+                    line_offset = offset
+                    offset += len(raw)
+                    line = raw.decode('utf-8').rstrip('\r\n')
+                    record = parse_line(line)
+                    if record is None or line == HEADER:
+                        continue
+                    if events is not None and record[1].upper() not in events:
+                        continue
+                    if start is not None or end is not None:
+                        try:
+                            epoch = parse_timestamp(record[0])
+                        except ValueError:
+                            continue
+                        if (start is not None and epoch < start) or (end is not None and epoch > end):
+                            continue
+                    yield line_offset, line
+
+    def stats(self):
+        return {
+            'entries': len(self.buckets),
+            'bucket_seconds': self.bucket_seconds,
+            'indexed_bytes': self.indexed_bytes,
+            'monotonic': self.monotonic,
+            'index_bytes': INDEX_HEADER.size + len(self.buckets) * INDEX_ENTRY.size,
+        }
+
+
+def parse_time(value):
+    # 'YYYY-MM-DD HH:MM:SS' (로그와 같은 기준의 epoch 초), 'YYYY-MM-DD HH:MM', 'YYYY-MM-DD'
+    for suffix in ('', ':00', ' 00:00:00'):
+        try:
+            return parse_timestamp(value + suffix)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f'invalid time: {value}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time-range queries over mission_computer_main.log')
+    parser.add_argument('--log', default=LOG_PATH)
+    parser.add_argument('--from', dest='start', type=parse_time)
+    parser.add_argument('--to', dest='end', type=parse_time)
+    parser.add_argument('--event', help='comma-separated levels, e.g. ERROR,WARNING')
+    parser.add_argument('--bucket', type=int, default=60, help='bucket size in seconds')
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--stats', action='store_true', help='print index stats to stderr')
+    args = parser.parse_args()
+
+    index = TimeIndex(args.log, args.bucket)
+    added = index.update(rebuild=args.rebuild)
+    events = args.event.split(',') if args.event else None
+    out = sys.stdout
+    for _, line in index.query(args.start, args.end, events):
+        out.write(line + '\n')
+    if args.stats:
+        print(dict(index.stats(), added=added), file=sys.stderr)
@@ -0,0 +1,298 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from log_index import FINGERPRINT_BYTES, fingerprint
+from mission_log import LOG_PATH, HEADER, parse_line
+
+# mission_computer_main.log 메시지 필드의 역색인 ('{로그}.kwidx/' 디렉터리)
+#   lines.offsets  : 줄 번호 -> 바이트 오프셋 (uint64, 덧붙이기만)
+#   lines.levels   : 줄 번호 -> 이벤트 레벨 코드 (uint8, meta.json의 levels 표. 표가 가득 차면 그 뒤 레벨은 OTHER_LEVEL)
+#   seg-N.*.npy    : 세그먼트마다 정렬된 토큰, 토큰별 시작 위치, 줄 번호 posting list
+# 로그에 줄이 추가되면 새 줄만 새 세그먼트로 색인하고, 세그먼트가 많아지면 하나로 합침
+# 사용 예) python log_search.py oxygen tank
+#         python log_search.py "oxygen OR parachute" --level ERROR,WARNING
+
+TOKEN = re.compile(r'\w+')
+MAX_TOKEN = 32
+MAX_SEGMENTS = 8
+SEGMENT_LINES = 1000000  # 세그먼트 하나를 만들 때 메모리에 모으는 최대 줄 수
+OTHER_LEVEL = 255  # uint8 마지막 코드: 레벨 표(최대 255개)에 들어가지 못한 레벨 (검색 때 원문으로 확인)
+MAX_LEVELS = OTHER_LEVEL
+
+
+def tokenize(text):
+    # 소문자 + 단어 문자만, 너무 긴 토큰은 잘라서 (고정 폭 토큰 배열)
+    return [token[:MAX_TOKEN] for token in TOKEN.findall(text.lower())]
+
+
+def parse_query(query):
+    # 'a b' / 'a AND b' = 모두 포함, 'a OR b' = 하나라도 (AND가 OR보다 먼저) -> OR로 묶인 토큰 집합 목록
+    groups = [set(tokenize(re.sub(r'\bAND\b', ' ', group))) for group in re.split(r'\s+OR\s+', query.strip())]
+    return [group for group in groups if group]
+
+
+class Segment:
+    def __init__(self, prefix):
+        self.tokens = np.load(f'{prefix}.tokens.npy', mmap_mode='r')
+        self.starts = np.load(f'{prefix}.starts.npy', mmap_mode='r')
+        self.postings = np.load(f'{prefix}.postings.npy', mmap_mode='r')
+
+    def lookup(self, token):
+        i = int(np.searchsorted(self.tokens, token))
+        if i < len(self.tokens) and self.tokens[i] == token:
+            return self.postings[self.starts[i]:self.starts[i + 1]]
+        return None
+
+    @staticmethod
+    def write(prefix, postings):
+        # postings: {토큰: 줄 번호 목록(오름차순)}
+        tokens = sorted(postings)
+        lengths = np.array([len(postings[token]) for token in tokens], dtype=np.int64)
+        starts = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=starts[1:])
+        flat = np.concatenate([np.asarray(postings[token], dtype=np.uint32) for token in tokens]) if tokens else np.zeros(0, np.uint32)
+        np.save(f'{prefix}.tokens.npy', np.array(tokens, dtype=f'U{MAX_TOKEN}'))
+        np.save(f'{prefix}.starts.npy', starts)
+        np.save(f'{prefix}.postings.npy', flat)
+
+
+class KeywordIndex:
+    def __init__(self, log_path=LOG_PATH, index_dir=None):
+        self.log_path = log_path
+        self.index_dir = index_dir or f'{log_path}.kwidx'
+        self.meta_path = os.path.join(self.index_dir, 'meta.json')
+        self.meta = None
+        self.segments = []
+
+    def _empty_meta(self):
+        return {'version': 1, 'indexed_bytes': 0, 'lines': 0, 'levels': [], 'segments': [], 'next_segment': 0,
+                'fingerprint_len': 0, 'fingerprint': ''}
+
+    def _path(self, name):
+        return os.path.join(self.index_dir, name)
+
+    def load(self):
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                self.meta = json.load(f)
+        except (OSError, ValueError):
+            self.meta = None
+            return False
+        self.segments = [Segment(self._path(name)) for name in self.meta['segments']]
+        lines = self.meta['lines']
+        # 메타가 가리키는 줄 수까지만 사용 (갱신 도중 죽어 남은 꼬리는 무시)
+        self.offsets = np.fromfile(self._path('lines.offsets'), dtype=np.uint64, count=lines) if lines else np.zeros(0, np.uint64)
+        self.levels = np.fromfile(self._path('lines.levels'), dtype=np.uint8, count=lines) if lines else np.zeros(0, np.uint8)
+        return True
+
+    def _save_meta(self):
+        tmp = self.meta_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def _valid_for_log(self, size):
+        meta = self.meta
+        if size < meta['indexed_bytes']:
+            return False
+        return meta['fingerprint_len'] == 0 or fingerprint(self.log_path, meta['fingerprint_len']).hex() == meta['fingerprint']
+
+    def _reset(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        for name in os.listdir(self.index_dir):
+            if name.startswith('seg-') or name.startswith('lines.'):
+                os.remove(self._path(name))
+        self.meta = self._empty_meta()
+        self.segments = []
+        self.offsets = np.zeros(0, np.uint64)
+        self.levels = np.zeros(0, np.uint8)
+
+    def update(self, rebuild=False):
+        # 색인하지 않은 완전한 줄만 새 세그먼트로. 반환값: 새로 색인한 줄 수
+        size = os.path.getsize(self.log_path)
+        if rebuild or not self.load() or not self._valid_for_log(size):
+            self._reset()
+        meta = self.meta
+        if meta['indexed_bytes'] == size:
+            return 0
+
+        added = 0
+        codes = {level: i for i, level in enumerate(meta['levels'])}
+        with open(self.log_path, 'rb') as f:
+            f.seek(meta['indexed_bytes'])
+            offset = meta['indexed_bytes']
+            while True:
+                postings = {}
+                offsets = []
+                levels = []
+                line_id = meta['lines']
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break
+                    line = raw.decode('utf-8').rstrip('\r\n')
+                    record = parse_line(line) if line != HEADER else None
+                    if record is not None:
+                        level = record[1].strip().upper()
+                        code = codes.get(level)
+                        if code is None:
+                            # 두 번째 필드는 아무 값이나 올 수 있으므로 표 크기를 제한
+                            code = len(meta['levels']) if len(meta['levels']) < MAX_LEVELS else OTHER_LEVEL
+                            if code != OTHER_LEVEL:
+                                meta['levels'].append(level)
+                                codes[level] = code
+                        for token in set(tokenize(record[2])):
+                            postings.setdefault(token, []).append(line_id)
+                        offsets.append(offset)
+                        levels.append(code)
+                        line_id += 1
+                    offset += len(raw)
+                    if len(offsets) >= SEGMENT_LINES:
+                        break
+                meta['indexed_bytes'] = offset
+                if offsets:
+                    self._append_segment(postings, offsets, levels)
+                    added += len(offsets)
+                if len(offsets) < SEGMENT_LINES:
+                    break
+        if meta['fingerprint_len'] < FINGERPRINT_BYTES:
+            meta['fingerprint_len'] = min(FINGERPRINT_BYTES, meta['indexed_bytes'])
+            meta['fingerprint'] = fingerprint(self.log_path, meta['fingerprint_len']).hex()
+        if len(meta['segments']) > MAX_SEGMENTS:
+            self.compact()
+        self._save_meta()
+        self.load()
+        return added
+
+    def _append_segment(self, postings, offsets, levels):
+        # 세그먼트 파일과 줄 정보를 먼저 쓰고, 메타(줄 수/세그먼트 목록)는 마지막에 저장
+        meta = self.meta
+        name = f"seg-{meta['next_segment']}"
+        Segment.write(self._path(name), postings)
+        for filename, values, dtype in (('lines.offsets', offsets, np.uint64), ('lines.levels', levels, np.uint8)):
+            with open(self._path(filename), 'ab') as f:
+                f.truncate(meta['lines'] * np.dtype(dtype).itemsize)
+                f.write(np.array(values, dtype=dtype).tobytes())
+        meta['lines'] += len(offsets)
+        meta['segments'].append(name)
+        meta['next_segment'] += 1
+        self._save_meta()
+
+    def compact(self):
+        # 모든 세그먼트를 하나로: 세그먼트의 줄 번호 범위는 겹치지 않으므로 토큰별로 이어 붙이면 정렬 유지
+        meta = self.meta
+        segments = [Segment(self._path(name)) for name in meta['segments']]
+        postings = {}
+        for segment in segments:
+            for i, token in enumerate(segment.tokens.tolist()):
+                postings.setdefault(token, []).append(np.asarray(segment.postings[segment.starts[i]:segment.starts[i + 1]]))
+        merged = {token: np.concatenate(parts) for token, parts in postings.items()}
+        name = f"seg-{meta['next_segment']}"
+        Segment.write(self._path(name), merged)
+        old = meta['segments']
+        meta['segments'] = [name]
+        meta['next_segment'] += 1
+        self._save_meta()
+        segments = None
+        for prefix in old:
+            for part in ('tokens', 'starts', 'postings'):
+                os.remove(self._path(f'{prefix}.{part}.npy'))
+
+    def postings(self, token):
+        parts = [p for p in (segment.lookup(token) for segment in self.segments) if p is not None]
+        if not parts:
+            return np.zeros(0, dtype=np.uint32)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def search(self, query, levels=None):
+        # 색인된 줄 중 일치하는 줄 번호 배열(오름차순)
+        result = None
+        for tokens in parse_query(query):
+            # 짧은 posting list부터 교집합
+            lists = sorted((self.postings(token) for token in tokens), key=len)
+            ids = lists[0]
+            for other in lists[1:]:
+                if not len(ids):
+                    break
+                ids = np.intersect1d(ids, other, assume_unique=True)
+            result = ids if result is None else np.union1d(result, ids)
+        if result is None:
+            result = np.zeros(0, dtype=np.uint32)
+        if levels:
+            wanted = {level.upper() for level in levels}
+            codes = [i for i, level in enumerate(self.meta['levels']) if level in wanted]
+            if len(self.meta['levels']) >= MAX_LEVELS and not wanted <= set(self.meta['levels']):
+                codes.append(OTHER_LEVEL)  # 표에 없는 레벨은 OTHER로 저장됨 -> search_lines에서 원문으로 확인
+            result = result[np.isin(self.levels[result], codes)]
+        return result
+
+    def search_lines(self, query, levels=None):
+        # (오프셋, 줄): 색인된 결과 + 아직 색인하지 않은 꼬리(줄바꿈 없는 마지막 줄 등)는 직접 검사
+        levels = {level.upper() for level in levels} if levels else None
+        ids = self.search(query, levels)
+        for line_id, (offset, line) in zip(ids, self.lines(ids)):
+            if levels is not None and self.levels[line_id] == OTHER_LEVEL and parse_line(line)[1].strip().upper() not in levels:
+                continue
+            yield offset, line
+        groups = parse_query(query)
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.meta['indexed_bytes'])
+            offset = self.meta['indexed_bytes']
+            for raw in f:
+                line = raw.decode('utf-8').rstrip('\r\n')
+                record = parse_line(line) if line != HEADER else None
+                if record is not None and (levels is None or record[1].strip().upper() in levels):
+                    tokens = set(tokenize(record[2]))
+                    if any(group <= tokens for group in groups):
+                        yield offset, line
+                offset += len(raw)
+
+    def lines(self, ids):
+        # 줄 번호 -> (오프셋, 원문 줄)
+        with open(self.log_path, 'rb') as f:
+            for line_id in ids:
+                offset = int(self.offsets[line_id])
+                f.seek(offset)
+                yield offset, f.readline().decode('utf-8').rstrip('\r\n')
+
+    def stats(self):
+        return {
+            'lines': self.meta['lines'],
+            'segments': len(self.meta['segments']),
+            'tokens': sum(len(segment.tokens) for segment in self.segments),
+            'levels': self.meta['levels'],
+            'indexed_bytes': self.meta['indexed_bytes'],
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Keyword search over mission_computer_main.log messages')
+    parser.add_argument('query', nargs='+', help="keywords; 'a b' = AND, 'a OR b' = OR")
+    parser.add_argument('--log', default=LOG_PATH)
+    parser.add_argument('--level', help='comma-separated levels, e.g. ERROR,WARNING')
+    parser.add_argument('--limit', type=int, default=None, help='print at most N lines')
+    parser.add_argument('--count', action='store_true', help='print only the number of matches')
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--stats', action='store_true', help='print index stats and timing to stderr')
+    args = parser.parse_args()
+
+    index = KeywordIndex(args.log)
+    added = index.update(rebuild=args.rebuild)
+    start = time.perf_counter()
+    matches = 0
+    for _, line in index.search_lines(' '.join(args.query), args.level.split(',') if args.level else None):
+        matches += 1
+        if not args.count:
+            sys.stdout.write(line + '\n')
+            if args.limit is not None and matches >= args.limit:
+                break
+    elapsed = time.perf_counter() - start
+    if args.count:
+        print(matches)
+    if args.stats:
+        print(dict(index.stats(), added=added, matches=matches, search_ms=round(elapsed * 1000, 3)), file=sys.stderr)
@@ -1,40 +1,34 @@
-import os
-import json
-from datetime import datetime  # 추가: datetime import
+import argparse
+from mission_log import LOG_PATH, JSON_PATH, ORDERS, PARSERS, RUN_SIZE, convert
 
-try:
-    # 파일 경로를 명확히 지정
-    #file_path = os.path.join('mars', 'mission_computer_main.log')
-    with open("./mission_computer_main.log", 'r', encoding='utf-8') as file:
-        content = file.read()
-        print("Log file content:")
-        print(content)
-
-    # 로그 데이터를 리스트로 변환 (event는 무시하고 timestamp와 message만)
-    lines = content.splitlines()[1:]  # 헤더 제외
-    log_list = [[line.split(',', 2)[0], line.split(',', 2)[2]] for line in lines]
-    print("\nLog list (before sort):")
-    print(log_list)
+# 로그 -> JSON 변환 (한 줄씩 스트리밍, 시간 역순 정렬, 같은 시각은 마지막 메시지만)
+# 사용 예) python main.py --quiet
+#         python main.py --order file   (파일 순서 그대로, 메모리 사용량 일정)
+#         python main.py --order external --run-size 100000 --tmp-dir /data/tmp   (RAM보다 큰 로그)
 
-    # 시간 역순 정렬 (datetime으로 변환하여 안전하게 정렬)
-    log_list.sort(key=lambda x: datetime.strptime(x[0], '%Y-%m-%d %H:%M:%S'), reverse=True)
-    print("\nSorted log list (reverse chronological):")
-    print(log_list)
+parser = argparse.ArgumentParser(description='Convert mission_computer_main.log to JSON')
+parser.add_argument('--input', default=LOG_PATH)
+parser.add_argument('--output', default=JSON_PATH)
+parser.add_argument('--order', choices=ORDERS, default='auto',
+                    help="'auto' = reverse chronological, picking reverse read / in-memory / external sort (default), "
+                         "'reverse' = in-memory sort, 'external' = on-disk sorted runs + merge, 'file' = log order")
+parser.add_argument('--run-size', type=int, default=RUN_SIZE, help='lines per sorted run for external sort')
+parser.add_argument('--tmp-dir', default=None, help='directory for external sort runs')
+parser.add_argument('--parser', choices=PARSERS, default='fast',
+                    help="timestamp parser for sorting: 'fast' (slicing), 'numpy' (bulk datetime64), 'strptime'")
+parser.add_argument('--quiet', action='store_true', help='do not echo the raw log content')
+args = parser.parse_args()
 
-    # 사전 객체로 변환
-    log_dict = {item[0]: item[1] for item in log_list}
-    
-    # JSON 파일로 저장
-    try:
-        with open('./mission_computer_main.json', 'w', encoding='utf-8') as json_file:
-            json.dump(log_dict, json_file, ensure_ascii=False, indent=4)
-        print("\nJSON file saved successfully.")
-    except Exception as e:
-        print(f'Error saving JSON: {e}')
+try:
+    if not args.quiet:
+        print("Log file content:")
+    stats = convert(args.input, args.output, args.order, echo=not args.quiet, parser=args.parser,
+                    run_size=args.run_size, tmp_dir=args.tmp_dir)
+    print(f"\nJSON file saved successfully. ({stats['written']} entries, {stats['skipped']} malformed lines skipped)")
 
 except FileNotFoundError:
     print('File not found. Ensure mission_computer_main.log exists in the mars directory.')
 except UnicodeDecodeError:
     print('Decoding error. Check the file encoding.')
 except Exception as e:
-    print(f'Unexpected error: {e}')
\ No newline at end of file
+    print(f'Unexpected error: {e}')
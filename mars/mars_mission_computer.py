@@ -1,3 +1,4 @@
+import argparse
 import random
 import time
 import json
@@ -5,7 +6,10 @@ import platform
 import os
 import threading
 import multiprocessing
-from datetime import datetime  # 추가: 타임스탬프를 위한 datetime import
+from mission_scheduler import PeriodicScheduler
+from sensor_store import SensorStore
+from mission_sinks import StdoutSink, QueueSink, drain_queue, make_record, make_sink
+from alert_rules import AlertEngine, load_rules
 
 class DummySensor:
     def __init__(self):
@@ -29,8 +33,87 @@ class DummySensor:
     def get_env(self):
         return self.env_values
 
+class SystemSampler:
+    # /proc/stat 직전 스냅샷과 비교해 CPU 사용률 계산 (sleep 없음), /proc/meminfo는 tick마다 한 번만 파싱
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.prev_cpu = None
+        self.last_tick = 0.0
+        self.snapshot = {'time': 0.0, 'cpu_usage': None, 'meminfo': {}}
+        self.available = platform.system() == 'Linux'
+        if self.available:
+            # 기준값을 미리 읽어 둠 -> 첫 값도 부팅 이후 평균이 아니라 생성 이후 구간의 사용률
+            self.prev_cpu = self._read_cpu()
+
+    def _read_cpu(self):
+        with open('/proc/stat') as f:
+            cpu = f.readline().split()[1:]
+        idle = int(cpu[3]) + int(cpu[4])
+        total = sum(int(x) for x in cpu)
+        return idle, total
+
+    def _read_meminfo(self):
+        meminfo = {}
+        with open('/proc/meminfo') as f:
+            for line in f:
+                name, value = line.split(':', 1)
+                meminfo[name] = int(value.split()[0])  # kB
+        return meminfo
+
+    def tick(self):
+        with self.lock:
+            return self._tick_locked()
+
+    def _tick_locked(self):
+        if not self.available:
+            return self.snapshot
+        idle, total = self._read_cpu()
+        meminfo = self._read_meminfo()
+        prev_idle, prev_total = self.prev_cpu
+        delta_idle = idle - prev_idle
+        delta_total = total - prev_total
+        if delta_total > 0:
+            cpu_percent = round(100 * (1 - delta_idle / delta_total), 2)
+            self.prev_cpu = (idle, total)
+        else:
+            # 직전 읽기 이후 jiffy가 하나도 지나지 않음: 이전 값을 유지하고 기준값은 그대로 둠
+            cpu_percent = self.snapshot['cpu_usage']
+        self.last_tick = time.monotonic()
+        self.snapshot = {'time': time.time(), 'cpu_usage': cpu_percent, 'meminfo': meminfo}
+        return self.snapshot
+
+    def latest(self):
+        # 최근 tick이 min_interval보다 오래됐으면 새로 읽고, 아니면 그대로 공유
+        # 확인과 갱신을 같은 잠금 안에서 -> 동시에 들어온 스레드가 거의 0초 구간으로 다시 계산하지 않음
+        with self.lock:
+            if time.monotonic() - self.last_tick >= self.min_interval:
+                return self._tick_locked()
+            return self.snapshot
+
+
+# 한 프로세스 안의 모든 MissionComputer(스레드 포함)가 같은 샘플러를 공유
+system_sampler = SystemSampler()
+
+# 출력 sink 기본값: 기존과 같은 사람이 읽는 형식 (스레드끼리 공유해도 줄이 섞이지 않음)
+default_sink = StdoutSink()
+
+# 작업 주기(초)와 시작 stagger 최대값. --interval-scale로 한꺼번에 줄이거나 늘림
+SENSOR_PERIOD = 5
+INFO_PERIOD = 20
+LOAD_PERIOD = 20
+STAGGER = 2
+
+# 경보 규칙 파일 (예: MARS_ALERT_RULES=alert_rules.json). 없으면 경보 검사 안 함
+ALERT_RULES_PATH = os.environ.get('MARS_ALERT_RULES')
+default_alert_rules = load_rules(ALERT_RULES_PATH) if ALERT_RULES_PATH else None
+
+# 센서 이력 파일 경로 (예: MARS_HISTORY_PATH=sensor_history -> sensor_history.values.npy 등). 없으면 메모리에만
+HISTORY_PATH = os.environ.get('MARS_HISTORY_PATH')
+
 class MissionComputer:
-    def __init__(self):
+    def __init__(self, sampler=None, history_capacity=17280, history_path=None, sink=None, alert_rules=None,
+                 interval_scale=1.0, stop_at=None):
         self.env_values = {
             'mars_base_internal_temperature': 0,
             'mars_base_external_temperature': 0,
@@ -40,92 +123,140 @@ class MissionComputer:
             'mars_base_internal_oxygen': 0
         }
         self.ds = DummySensor()
+        self.sampler = sampler or system_sampler
+        # 센서 값 이력 (기본 5초 간격 24시간분). 센서 값을 처음 기록할 때 만듦 -> 정보/부하 작업은 버퍼 없음
+        self.history_capacity = history_capacity
+        self.history_path = history_path
+        self.history = None
+        self.sink = sink or default_sink
+        alert_rules = alert_rules if alert_rules is not None else default_alert_rules
+        self.alerts = AlertEngine(alert_rules) if alert_rules else None
+        self.interval_scale = interval_scale
+        self.stop_at = stop_at  # time.time() 기준 종료 시각 (None이면 계속)
+        self.started = time.time()
+
+    def period(self, seconds):
+        return seconds * self.interval_scale
+
+    def running(self):
+        return self.stop_at is None or time.time() < self.stop_at
+
+    def sensor_time(self, ts):
+        # 경보 규칙의 시간: --interval-scale로 주기를 줄여도 실제 주기로 돌린 것과 같은 시각 (rate 규칙 의미 유지)
+        return self.started + (ts - self.started) / self.interval_scale
+
+    def emit(self, identifier, kind, data):
+        record = make_record(identifier, kind, data)
+        self.sink.write(record)
+        if kind == 'Sensor' and self.alerts:
+            # 상태가 바뀐 규칙만 'Alert' 레코드로 (히스테리시스로 경보 폭주 방지)
+            for event in self.alerts.evaluate(data, self.sensor_time(record['ts'])):
+                del event['stream']
+                self.sink.write(make_record(identifier, 'Alert', event, record['ts']))
+
+    def sensor_history(self):
+        if self.history is None:
+            self.history = SensorStore(self.env_values, self.history_capacity, self.history_path)
+        return self.history
+
+    def record_sensor(self):
+        self.ds.set_env()
+        self.env_values = self.ds.get_env()
+        self.sensor_history().append(self.env_values)
+        return self.env_values
+
+    def sensor_trend(self, seconds=300):
+        # 최근 seconds초 동안 지표별 평균/최소/최대/분위수
+        history = self.sensor_history()
+        return {name: history.summary(name, seconds) for name in history.metrics}
+
+    def close(self):
+        # 종료 시: 남은 레코드를 내보내고 이력 파일(메모리 맵)을 디스크에 기록
+        self.sink.flush()
+        if self.history is not None:
+            self.history.snapshot()
+
+    def collect_info(self):
+        info = {
+            'os': platform.system(),
+            'os_version': platform.release(),
+            'cpu_type': platform.processor(),
+            'cpu_cores': os.cpu_count()
+        }
+        meminfo = self.sampler.latest()['meminfo']
+        if 'MemTotal' in meminfo:
+            info['memory_size'] = round(meminfo['MemTotal'] / 1024 ** 2, 2)  # GB
+        else:
+            info['memory_size'] = 'Not available on this OS'
+        return info
+
+    def collect_load(self):
+        load = {}
+        snapshot = self.sampler.latest()
+        meminfo = snapshot['meminfo']
+        if snapshot['cpu_usage'] is not None and 'MemAvailable' in meminfo:
+            load['cpu_usage'] = snapshot['cpu_usage']
+            used = meminfo['MemTotal'] - meminfo['MemAvailable']
+            load['memory_usage'] = round((used / meminfo['MemTotal']) * 100, 2)
+        else:
+            load['cpu_usage'] = 'Not available on this OS'
+            load['memory_usage'] = 'Not available on this OS'
+        return load
 
     def get_sensor_data(self, identifier):
-        time.sleep(random.uniform(0, 2))  # 초기 지연으로 stagger
-        while True:
-            self.ds.set_env()
-            self.env_values = self.ds.get_env()
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"{identifier} [{timestamp}] (Sensor): \n{json.dumps(self.env_values, indent=4)}")
-            time.sleep(5)
+        try:
+            time.sleep(random.uniform(0, self.period(STAGGER)))  # 초기 지연으로 stagger
+            while self.running():
+                self.emit(identifier, 'Sensor', dict(self.record_sensor()))
+                time.sleep(self.period(SENSOR_PERIOD))
+        finally:
+            self.close()
 
     def get_mission_computer_info(self, identifier):
-        time.sleep(random.uniform(0, 2))
-        while True:
+        time.sleep(random.uniform(0, self.period(STAGGER)))
+        while self.running():
             try:
-                info = {
-                    'os': platform.system(),
-                    'os_version': platform.release(),
-                    'cpu_type': platform.processor(),
-                    'cpu_cores': os.cpu_count()
-                }
-                if platform.system() == 'Linux':
-                    with open('/proc/meminfo') as f:
-                        meminfo = f.read()
-                    total_mem = int([line for line in meminfo.splitlines() if line.startswith('MemTotal')][0].split()[1]) / 1024 ** 2  # GB
-                    info['memory_size'] = round(total_mem, 2)
-                else:
-                    info['memory_size'] = 'Not available on this OS'
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                print(f"{identifier} [{timestamp}] (Info): \n{json.dumps(info, indent=4)}")
+                self.emit(identifier, 'Info', self.collect_info())
             except Exception as e:
                 print(f'Error getting system info: {e}')
-            time.sleep(20)
+            time.sleep(self.period(INFO_PERIOD))
+        self.sink.flush()
 
     def get_mission_computer_load(self, identifier):
-        time.sleep(random.uniform(0, 2))
-        while True:
+        time.sleep(random.uniform(0, self.period(STAGGER)))
+        while self.running():
             try:
-                load = {}
-                if platform.system() == 'Linux':
-                    with open('/proc/stat') as f:
-                        lines = f.read().splitlines()
-                    cpu = lines[0].split()[1:]
-                    idle1 = int(cpu[3]) + int(cpu[4])
-                    total1 = sum(int(x) for x in cpu)
-                    time.sleep(1)
-                    with open('/proc/stat') as f:
-                        lines = f.read().splitlines()
-                    cpu = lines[0].split()[1:]
-                    idle2 = int(cpu[3]) + int(cpu[4])
-                    total2 = sum(int(x) for x in cpu)
-                    delta_idle = idle2 - idle1
-                    delta_total = total2 - total1
-                    cpu_percent = 100 * (1 - delta_idle / delta_total) if delta_total != 0 else 0.0
-                    load['cpu_usage'] = round(cpu_percent, 2)
-
-                    with open('/proc/meminfo') as f:
-                        meminfo = f.read()
-                    lines = meminfo.splitlines()
-                    total = int([line for line in lines if line.startswith('MemTotal')][0].split()[1])
-                    free = int([line for line in lines if line.startswith('MemFree')][0].split()[1])
-                    available = int([line for line in lines if line.startswith('MemAvailable')][0].split()[1])
-                    used = total - available
-                    memory_percent = (used / total) * 100
-                    load['memory_usage'] = round(memory_percent, 2)
-                else:
-                    load['cpu_usage'] = 'Not available on this OS'
-                    load['memory_usage'] = 'Not available on this OS'
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                print(f"{identifier} [{timestamp}] (Load): \n{json.dumps(load, indent=4)}")
+                self.emit(identifier, 'Load', self.collect_load())
             except Exception as e:
                 print(f'Error getting load: {e}')
-            time.sleep(20)
+            time.sleep(self.period(LOAD_PERIOD))
+        self.sink.flush()
+
+def stop_time(duration):
+    return time.time() + duration if duration is not None else None
+
+def run_multiprocess(sink=None, duration=None, interval_scale=1.0, history_path=None):
+    # 자식 프로세스는 레코드를 큐로 보내고, 부모의 writer 스레드 하나만 실제로 기록
+    sink = sink or default_sink
+    stop_at = stop_time(duration)
+    record_queue = multiprocessing.Queue()
+    stop_event = threading.Event()
+    writer = threading.Thread(target=drain_queue, args=(record_queue, sink, stop_event), daemon=True)
+    writer.start()
 
-def run_multiprocess():
     def run_info():
-        rc = MissionComputer()
+        rc = MissionComputer(sink=QueueSink(record_queue), interval_scale=interval_scale, stop_at=stop_at)
         pid = multiprocessing.current_process().pid
         rc.get_mission_computer_info(f"Process {pid}")
 
     def run_load():
-        rc = MissionComputer()
+        rc = MissionComputer(sink=QueueSink(record_queue), interval_scale=interval_scale, stop_at=stop_at)
         pid = multiprocessing.current_process().pid
         rc.get_mission_computer_load(f"Process {pid}")
 
     def run_sensor():
-        rc = MissionComputer()
+        rc = MissionComputer(history_path=history_path, sink=QueueSink(record_queue), interval_scale=interval_scale,
+                             stop_at=stop_at)
         pid = multiprocessing.current_process().pid
         rc.get_sensor_data(f"Process {pid}")
 
@@ -135,23 +266,29 @@ def run_multiprocess():
     p1.start()
     p2.start()
     p3.start()
-    p1.join()
-    p2.join()
-    p3.join()
+    try:
+        p1.join()
+        p2.join()
+        p3.join()
+    finally:
+        stop_event.set()
+        writer.join()
+
+def run_multithread(sink=None, duration=None, interval_scale=1.0, history_path=None):
+    stop_at = stop_time(duration)
 
-def run_multithread():
     def run_info():
-        rc = MissionComputer()
+        rc = MissionComputer(sink=sink, interval_scale=interval_scale, stop_at=stop_at)
         name = threading.current_thread().name
         rc.get_mission_computer_info(f"Thread {name}")
 
     def run_load():
-        rc = MissionComputer()
+        rc = MissionComputer(sink=sink, interval_scale=interval_scale, stop_at=stop_at)
         name = threading.current_thread().name
         rc.get_mission_computer_load(f"Thread {name}")
 
     def run_sensor():
-        rc = MissionComputer()
+        rc = MissionComputer(history_path=history_path, sink=sink, interval_scale=interval_scale, stop_at=stop_at)
         name = threading.current_thread().name
         rc.get_sensor_data(f"Thread {name}")
 
@@ -165,88 +302,103 @@ def run_multithread():
     t2.join()
     t3.join()
 
-def run_single():
-    rc = MissionComputer()
+def run_single(sink=None, duration=None, interval_scale=1.0, history_path=None):
+    rc = MissionComputer(history_path=history_path, sink=sink, interval_scale=interval_scale,
+                         stop_at=stop_time(duration))
     start_time = time.time()
-    next_sensor = start_time + random.uniform(0, 2)
-    next_info = start_time + random.uniform(0, 2)
-    next_load = start_time + random.uniform(0, 2)
-    while True:
-        current_time = time.time()
-        if current_time >= next_sensor:
-            rc.ds.set_env()
-            rc.env_values = rc.ds.get_env()
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"Single [{timestamp}] (Sensor): \n{json.dumps(rc.env_values, indent=4)}")
-            next_sensor += 5
-        if current_time >= next_info:
-            try:
-                info = {
-                    'os': platform.system(),
-                    'os_version': platform.release(),
-                    'cpu_type': platform.processor(),
-                    'cpu_cores': os.cpu_count()
-                }
-                if platform.system() == 'Linux':
-                    with open('/proc/meminfo') as f:
-                        meminfo = f.read()
-                    total_mem = int([line for line in meminfo.splitlines() if line.startswith('MemTotal')][0].split()[1]) / 1024 ** 2  # GB
-                    info['memory_size'] = round(total_mem, 2)
-                else:
-                    info['memory_size'] = 'Not available on this OS'
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                print(f"Single [{timestamp}] (Info): \n{json.dumps(info, indent=4)}")
-            except Exception as e:
-                print(f'Error getting system info: {e}')
-            next_info += 20
-        if current_time >= next_load:
-            try:
-                load = {}
-                if platform.system() == 'Linux':
-                    with open('/proc/stat') as f:
-                        lines = f.read().splitlines()
-                    cpu = lines[0].split()[1:]
-                    idle1 = int(cpu[3]) + int(cpu[4])
-                    total1 = sum(int(x) for x in cpu)
-                    time.sleep(1)
-                    with open('/proc/stat') as f:
-                        lines = f.read().splitlines()
-                    cpu = lines[0].split()[1:]
-                    idle2 = int(cpu[3]) + int(cpu[4])
-                    total2 = sum(int(x) for x in cpu)
-                    delta_idle = idle2 - idle1
-                    delta_total = total2 - total1
-                    cpu_percent = 100 * (1 - delta_idle / delta_total) if delta_total != 0 else 0.0
-                    load['cpu_usage'] = round(cpu_percent, 2)
-
-                    with open('/proc/meminfo') as f:
-                        meminfo = f.read()
-                    lines = meminfo.splitlines()
-                    total = int([line for line in lines if line.startswith('MemTotal')][0].split()[1])
-                    free = int([line for line in lines if line.startswith('MemFree')][0].split()[1])
-                    available = int([line for line in lines if line.startswith('MemAvailable')][0].split()[1])
-                    used = total - available
-                    memory_percent = (used / total) * 100
-                    load['memory_usage'] = round(memory_percent, 2)
-                else:
-                    load['cpu_usage'] = 'Not available on this OS'
-                    load['memory_usage'] = 'Not available on this OS'
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                print(f"Single [{timestamp}] (Load): \n{json.dumps(load, indent=4)}")
-            except Exception as e:
-                print(f'Error getting load: {e}')
-            next_load += 20
-        time.sleep(0.1)  # Prevent busy loop
+    next_sensor = start_time + random.uniform(0, rc.period(STAGGER))
+    next_info = start_time + random.uniform(0, rc.period(STAGGER))
+    next_load = start_time + random.uniform(0, rc.period(STAGGER))
+    try:
+        while rc.running():
+            current_time = time.time()
+            if current_time >= next_sensor:
+                rc.emit('Single', 'Sensor', dict(rc.record_sensor()))
+                next_sensor += rc.period(SENSOR_PERIOD)
+            if current_time >= next_info:
+                try:
+                    rc.emit('Single', 'Info', rc.collect_info())
+                except Exception as e:
+                    print(f'Error getting system info: {e}')
+                next_info += rc.period(INFO_PERIOD)
+            if current_time >= next_load:
+                try:
+                    rc.emit('Single', 'Load', rc.collect_load())
+                except Exception as e:
+                    print(f'Error getting load: {e}')
+                next_load += rc.period(LOAD_PERIOD)
+            time.sleep(rc.period(0.1))  # Prevent busy loop
+    finally:
+        rc.close()
+
+def run_event_loop(duration=None, sensor_period=SENSOR_PERIOD, info_period=INFO_PERIOD, load_period=LOAD_PERIOD,
+                   stats_period=60, sink=None, interval_scale=1.0, history_path=None):
+    # 타이머 힙 스케줄러 하나로 센서/정보/부하 작업을 주기 실행 (스레드 1개, drift 없는 예약)
+    rc = MissionComputer(history_path=history_path, sink=sink, interval_scale=interval_scale)
+    scheduler = PeriodicScheduler()
+
+    def sensor_job():
+        rc.emit('EventLoop', 'Sensor', dict(rc.record_sensor()))
+
+    def info_job():
+        rc.emit('EventLoop', 'Info', rc.collect_info())
+
+    def load_job():
+        rc.emit('EventLoop', 'Load', rc.collect_load())
+
+    def stats_job():
+        rc.emit('EventLoop', 'Jitter', scheduler.stats())
+
+    scheduler.add('sensor', rc.period(sensor_period), sensor_job, offset=random.uniform(0, rc.period(STAGGER)))
+    scheduler.add('info', rc.period(info_period), info_job, offset=random.uniform(0, rc.period(STAGGER)))
+    scheduler.add('load', rc.period(load_period), load_job, offset=random.uniform(0, rc.period(STAGGER)))
+    scheduler.add('jitter', rc.period(stats_period), stats_job, offset=rc.period(stats_period))
+    try:
+        scheduler.run(duration)
+    except KeyboardInterrupt:
+        pass
+    rc.close()
+    return scheduler.stats()
+
+MODES = ['multiprocess', 'multithread', 'single', 'eventloop', 'fleet']
 
 if __name__ == '__main__':
-    # 모드를 선택: 'multiprocess', 'multithread', 또는 'single'
-    mode = 'multiprocess'  # 여기서 변경하여 모드 선택 (또는 sys.argv로 동적 설정 가능)
-
-    if mode == 'multiprocess':
-        run_multiprocess()
-    elif mode == 'multithread':
-        run_multithread()
-    elif mode == 'single':
-        run_single()
-    else:
-        print("Invalid mode selected.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Mars mission computer')
+    parser.add_argument('--mode', choices=MODES, default='multiprocess',
+                        help="'fleet' = simulated fleet of bases (fleet_sim.py)")
+    parser.add_argument('--duration', type=float, default=None, help='seconds to run (default: forever, fleet: 10)')
+    parser.add_argument('--interval-scale', type=float, default=1.0,
+                        help='multiply sensor/info/load periods, e.g. 0.01 = 100x faster')
+    # 출력 sink: 'stdout', 'stdout-compact', 'ndjson:경로', 'binary:경로', 'record:경로' (쉼표로 여러 개)
+    # 'record:경로'로 녹화한 파일은 mission_replay.py로 빠르게 재생
+    parser.add_argument('--sink', default=os.environ.get('MARS_SINK', 'stdout'))
+    # 센서 이력을 메모리 맵 파일로 (재시작해도 이어 씀). --trend는 그 이력의 최근 N초 요약만 출력
+    parser.add_argument('--history', default=HISTORY_PATH, help='sensor history file prefix (default: MARS_HISTORY_PATH)')
+    parser.add_argument('--trend', type=float, metavar='SECONDS', help='print a sensor trend summary from --history and exit')
+    args = parser.parse_args()
+    if args.trend is not None:
+        if not args.history:
+            parser.error('--trend needs --history or MARS_HISTORY_PATH')
+        print(json.dumps(MissionComputer(history_path=args.history).sensor_trend(args.trend), indent=4))
+        parser.exit()
+    sink = make_sink(args.sink)
+
+    try:
+        if args.mode == 'multiprocess':
+            run_multiprocess(sink, args.duration, args.interval_scale, args.history)
+        elif args.mode == 'multithread':
+            run_multithread(sink, args.duration, args.interval_scale, args.history)
+        elif args.mode == 'single':
+            run_single(sink, args.duration, args.interval_scale, args.history)
+        elif args.mode == 'eventloop':
+            run_event_loop(args.duration, sink=sink, interval_scale=args.interval_scale, history_path=args.history)
+        elif args.mode == 'fleet':
+            from fleet_sim import run_fleet
+            bases = int(os.environ.get('MARS_FLEET_BASES', 10000))
+            duration = args.duration if args.duration is not None else 10.0
+            print(json.dumps(run_fleet(bases=bases, duration=duration, rules=default_alert_rules,
+                                       sample_period=SENSOR_PERIOD), indent=4))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from mars_mission_computer import SENSOR_PERIOD, INFO_PERIOD, LOAD_PERIOD
+
+# 실행 모드 비교: 각 모드를 주기를 줄여(--interval-scale) 하위 프로세스로 duration초 돌리고
+# CPU 시간, RSS, 문맥 전환, 목표 주기 대비 지터, 출력 레코드 처리량을 JSON 보고서로 저장
+# 사용 예) python mission_benchmark.py --modes single,multithread,multiprocess,eventloop --duration 20 --interval-scale 0.01
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ['single', 'multithread', 'multiprocess', 'eventloop']
+PERIODS = {'Sensor': SENSOR_PERIOD, 'Info': INFO_PERIOD, 'Load': LOAD_PERIOD}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def tree_rss_kb(root_pid):
+    # root와 그 자손 프로세스들의 VmRSS 합 (multiprocess 모드는 프로세스 4개)
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            with open(f'/proc/{entry}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        rss[int(entry)] = int(line.split()[1])
+                        break
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+def jitter(records, scale):
+    # (source, kind) 스트림별 연속 레코드 간격과 목표 주기의 차이, 그리고 누적 drift
+    streams = {}
+    for record in records:
+        if record['kind'] in PERIODS:
+            streams.setdefault((record['source'], record['kind']), []).append(record['ts'])
+    result = {}
+    for kind, period in PERIODS.items():
+        target = period * scale
+        errors = []
+        drift = []
+        for (source, k), stamps in streams.items():
+            if k != kind or len(stamps) < 2:
+                continue
+            stamps.sort()
+            errors.extend(abs((b - a) - target) for a, b in zip(stamps, stamps[1:]))
+            drift.append((stamps[-1] - stamps[0]) - (len(stamps) - 1) * target)
+        result[kind] = {
+            'target_ms': round(target * 1000, 3),
+            'intervals': len(errors),
+            'mean_ms': round(sum(errors) / len(errors) * 1000, 3) if errors else 0.0,
+            'p99_ms': round(percentile(errors, 0.99) * 1000, 3),
+            'max_ms': round(max(errors, default=0.0) * 1000, 3),
+            'drift_ms': round(max(drift, key=abs) * 1000, 3) if drift else 0.0,
+        }
+    return result
+
+
+def bench_mode(mode, args, workdir):
+    output = os.path.join(workdir, f'{mode}.ndjson')
+    cmd = [sys.executable, os.path.join(BASE_DIR, 'mars_mission_computer.py'), '--mode', mode,
+           '--duration', str(args.duration), '--interval-scale', str(args.interval_scale),
+           '--sink', f'ndjson:{output}']
+    env = dict(os.environ)
+    env.pop('MARS_ALERT_RULES', None)
+    errors = os.path.join(workdir, f'{mode}.stderr')
+    start = time.perf_counter()
+    with open(errors, 'wb') as stderr:
+        proc = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+    peak_rss = 0
+    while True:
+        # wait4: 끝난 프로세스와 그것이 거둔 자손들의 자원 사용량 (poll()은 먼저 거둬 버리므로 사용하지 않음)
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            break
+        peak_rss = max(peak_rss, tree_rss_kb(proc.pid))
+        time.sleep(args.sample_interval)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        with open(errors, encoding='utf-8', errors='replace') as f:
+            raise RuntimeError(f.read()[-500:])
+
+    with open(output, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    counts = {}
+    for record in records:
+        counts[record['kind']] = counts.get(record['kind'], 0) + 1
+    cpu = usage.ru_utime + usage.ru_stime
+    return {
+        'wall_s': round(wall, 3),
+        'cpu_user_s': round(usage.ru_utime, 3),
+        'cpu_sys_s': round(usage.ru_stime, 3),
+        'cpu_percent': round(cpu / wall * 100, 2) if wall else 0.0,
+        'max_rss_kb': usage.ru_maxrss,  # 가장 큰 단일 프로세스
+        'peak_tree_rss_kb': peak_rss,  # 모든 프로세스 합
+        'voluntary_ctx_switches': usage.ru_nvcsw,
+        'involuntary_ctx_switches': usage.ru_nivcsw,
+        'records': counts,
+        'records_per_sec': round(len(records) / args.duration, 2),
+        'jitter': jitter(records, args.interval_scale),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mars mission computer mode benchmark')
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per mode')
+    parser.add_argument('--interval-scale', type=float, default=0.01, help='0.01 = sensor every 50 ms, info/load every 200 ms')
+    parser.add_argument('--sample-interval', type=float, default=0.2, help='RSS sampling period (s)')
+    parser.add_argument('--output', default=None, help='JSON report path')
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_cores': os.cpu_count(),
+        'config': vars(args),
+        'results': [],
+    }
+    for mode in args.modes.split(','):
+        with tempfile.TemporaryDirectory() as workdir:
+            try:
+                result = bench_mode(mode, args, workdir)
+            except Exception as e:
+                result = {'error': str(e)}
+        result['mode'] = mode
+        report['results'].append(result)
+        sensor = result.get('jitter', {}).get('Sensor', {})
+        print(f"{mode:13} cpu {result.get('cpu_percent', '-'):>6}%  "
+              f"rss {result.get('peak_tree_rss_kb', '-'):>7} KB  "
+              f"ctx {result.get('voluntary_ctx_switches', '-'):>6}/{result.get('involuntary_ctx_switches', '-')}  "
+              f"{result.get('records_per_sec', '-'):>7} rec/s  "
+              f"sensor jitter p99 {sensor.get('p99_ms', '-')} ms drift {sensor.get('drift_ms', '-')} ms  "
+              f"{result.get('error', '')}")
+
+    output = args.output or f"mission_benchmark_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'Report saved: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+import calendar
+import heapq
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# mission_computer_main.log ('timestamp,event,message' CSV) 스트리밍 처리
+# 파일 전체를 읽지 않고 한 줄씩: 메모리 사용량이 로그 크기와 무관
+
+LOG_PATH = 'mission_computer_main.log'
+JSON_PATH = 'mission_computer_main.json'
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+HEADER = 'timestamp,event,message'
+PARSERS = ['fast', 'numpy', 'strptime']
+ORDERS = ['auto', 'reverse', 'external', 'file']
+RUN_SIZE = 200000  # 외부 정렬에서 한 번에 메모리에 두는 줄 수
+
+
+def parse_line(line):
+    # split 한 번: (timestamp, event, message), 필드가 모자라면 None
+    parts = line.split(',', 2)
+    if len(parts) < 3:
+        return None
+    return parts[0], parts[1], parts[2]
+
+
+def iter_lines(path, echo=None):
+    # (바이트 오프셋, 줄) 순서대로. echo가 있으면 원문을 그대로 흘려 보냄
+    offset = 0
+    with open(path, 'rb') as f:
+        for raw in f:
+            line = raw.decode('utf-8').rstrip('\r\n')
+            if echo is not None:
+                echo.write(line + '\n')
+            yield offset, line
+            offset += len(raw)
+
+
+def iter_lines_reverse(path, block_size=1 << 16):
+    # 파일 끝에서부터 블록 단위로 읽어 (바이트 오프셋, 줄)을 역순으로
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b''
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size) + tail
+            lines = block.split(b'\n')
+            tail = lines[0]  # 앞 블록과 이어지는 (아직 덜 읽은) 줄
+            start = position + len(block)
+            for raw in reversed(lines[1:]):
+                start -= len(raw)
+                yield start, raw.decode('utf-8').rstrip('\r')
+                start -= 1
+        yield 0, tail.decode('utf-8').rstrip('\r')
+
+
+def iter_records(path, echo=None, stats=None, reverse=False):
+    # 헤더/빈 줄/형식이 맞지 않는 줄은 건너뜀 (stats['skipped']에 개수). reverse=True면 파일 끝부터
+    for offset, line in (iter_lines_reverse(path) if reverse else iter_lines(path, echo)):
+        if offset == 0 and line == HEADER:
+            continue
+        record = parse_line(line) if line else None
+        if record is None:
+            if stats is not None and line:
+                stats['skipped'] = stats.get('skipped', 0) + 1
+            continue
+        yield record
+
+
+class JsonObjectWriter:
+    # json.dump(dict, indent=4)와 같은 모양을 키/값 한 쌍씩 바로 파일에 기록
+    def __init__(self, file, indent=4):
+        self.file = file
+        self.separator = ',\n' + ' ' * indent
+        self.count = 0
+        self.file.write('{')
+
+    def write(self, key, value):
+        self.file.write(self.separator[1:] if self.count == 0 else self.separator)
+        self.file.write(json.dumps(key, ensure_ascii=False))
+        self.file.write(': ')
+        self.file.write(json.dumps(value, ensure_ascii=False))
+        self.count += 1
+
+    def close(self):
+        self.file.write('\n}' if self.count else '}')
+
+
+def write_json(pairs, path):
+    # (timestamp, message) 순서대로 기록. 같은 timestamp가 연달아 오면 dict처럼 마지막 값만 남김
+    with open(path, 'w', encoding='utf-8') as f:
+        writer = JsonObjectWriter(f)
+        current = None
+        for key, value in pairs:
+            if current is not None and key != current[0]:
+                writer.write(*current)
+            current = (key, value)
+        if current is not None:
+            writer.write(*current)
+        writer.close()
+    return writer.count
+
+
+@lru_cache(maxsize=4096)
+def _epoch_day(date):
+    # 'YYYY-MM-DD' -> 1970-01-01부터의 일 수 (로그 한 줄마다가 아니라 날짜마다 한 번 계산), 잘못된 날짜면 None
+    if not (date[:4] + date[5:7] + date[8:10]).isdigit() or not date.isascii():
+        return None
+    year, month, day = int(date[0:4]), int(date[5:7]), int(date[8:10])
+    if year < 1 or not (1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]):
+        return None
+    # days_from_civil (그레고리력 -> 일 수)
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+
+def parse_timestamp(text):
+    # 고정 폭 'YYYY-MM-DD HH:MM:SS' -> epoch 초 (UTC로 간주, 정렬/비교용)
+    # 자리 위치가 맞으면 슬라이스로 바로 계산, 아니면 strptime (그래도 안 되면 ValueError)
+    if len(text) == 19 and text[4] == '-' and text[7] == '-' and text[10] == ' ' and text[13] == ':' and text[16] == ':':
+        days = _epoch_day(text[:10])
+        clock = text[11:13] + text[14:16] + text[17:19]
+        if days is not None and clock.isdigit() and clock.isascii():
+            hour, minute, second = int(clock[0:2]), int(clock[2:4]), int(clock[4:6])
+            if hour < 24 and minute < 60 and second < 60:
+                return days * 86400 + hour * 3600 + minute * 60 + second
+    return calendar.timegm(datetime.strptime(text, TIME_FORMAT).timetuple())
+
+
+def parse_timestamps(texts):
+    # 전체 파일 모드: 배열 한 번에 datetime64[s]로 변환 -> (epoch 초 int64 배열, 파싱 실패 마스크)
+    # 자리 위치가 맞지 않는 값만 parse_timestamp(strptime)로 하나씩 처리
+    texts = np.asarray(texts, dtype=str)
+    epochs = np.zeros(len(texts), dtype=np.int64)
+    bad = np.zeros(len(texts), dtype=bool)
+    if len(texts) == 0:
+        return epochs, bad
+    layout = np.char.str_len(texts) == 19
+    fixed = texts[layout].astype('U19')
+    codes = fixed.view(np.uint32).reshape(-1, 19)
+    digits = np.ones(19, dtype=bool)
+    digits[[4, 7, 10, 13, 16]] = False
+    layout_ok = (
+        ((codes[:, digits] >= 48) & (codes[:, digits] <= 57)).all(axis=1)
+        & (codes[:, 4] == 45) & (codes[:, 7] == 45) & (codes[:, 10] == 32) & (codes[:, 13] == 58) & (codes[:, 16] == 58)
+    )
+    layout[layout] = layout_ok
+    try:
+        epochs[layout] = fixed[layout_ok].astype('datetime64[s]').astype(np.int64)
+    except ValueError:
+        # 날짜 범위 오류(예: 02-30)가 섞여 있으면 그 묶음만 하나씩
+        layout[:] = False
+    for i in np.flatnonzero(~layout):
+        try:
+            epochs[i] = parse_timestamp(str(texts[i]))
+        except ValueError:
+            bad[i] = True
+    return epochs, bad
+
+
+def _parse_strptime(text):
+    return calendar.timegm(datetime.strptime(text, TIME_FORMAT).timetuple())
+
+
+def line_parser(parser):
+    # 한 줄씩 처리하는 경로용 파서 (numpy는 일괄 변환 전용이라 fast 사용)
+    return _parse_strptime if parser == 'strptime' else parse_timestamp
+
+
+def detect_order(path, parser='fast', echo=None):
+    # 한 번 훑어 시간 순서 확인 -> ('ascending' | 'descending' | None, 시각이 유효한 줄 수)
+    parse = line_parser(parser)
+    ascending = descending = True
+    previous = None
+    count = 0
+    for timestamp, _, _ in iter_records(path, echo):
+        try:
+            epoch = parse(timestamp)
+        except ValueError:
+            continue
+        if previous is not None:
+            ascending = ascending and epoch >= previous
+            descending = descending and epoch <= previous
+        previous = epoch
+        count += 1
+    if ascending:
+        return 'ascending', count
+    return ('descending' if descending else None), count
+
+
+def _keyed(pairs, parse, stats):
+    for timestamp, message in pairs:
+        try:
+            yield parse(timestamp), timestamp, message
+        except ValueError:
+            stats['skipped'] = stats.get('skipped', 0) + 1
+
+
+def reverse_sorted_file(path, parser='fast', stats=None):
+    # 이미 시간순인 로그: 정렬 없이 파일을 끝에서부터 읽으면 시간 역순
+    # 같은 시각이 연달아 있으면 그 묶음만 원래 순서로 되돌림 (정렬 결과와 같게)
+    stats = stats if stats is not None else {}
+    pairs = ((timestamp, message) for timestamp, _, message in iter_records(path, stats=stats, reverse=True))
+    group = []
+    group_epoch = None
+    for epoch, timestamp, message in _keyed(pairs, line_parser(parser), stats):
+        if group and epoch != group_epoch:
+            yield from reversed(group)
+            group = []
+        group.append((timestamp, message))
+        group_epoch = epoch
+    yield from reversed(group)
+
+
+def _write_run(items, workdir, name):
+    # 정렬된 run 한 개: '-epoch\tseq\ttimestamp 길이\ttimestamp+message' 한 줄씩
+    path = os.path.join(workdir, f'run-{name}.txt')
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.writelines(f'{key}\t{seq}\t{len(timestamp)}\t{timestamp}{message}\n' for key, seq, timestamp, message in items)
+    return path
+
+
+def _read_run(path):
+    with open(path, encoding='utf-8', newline='\n') as f:
+        for line in f:
+            key, seq, size, rest = line[:-1].split('\t', 3)
+            size = int(size)
+            yield int(key), int(seq), rest[:size], rest[size:]
+
+
+def external_sort(records, parser='fast', run_size=RUN_SIZE, tmp_dir=None, fan_in=64, stats=None):
+    # RAM보다 큰 로그: run_size줄씩 정렬해 임시 파일(run)로 쓰고, 힙으로 k-way 병합해 시간 역순으로 흘려 보냄
+    # 정렬 키 (-epoch, 원래 순서) -> 같은 시각은 원래 순서 유지. run이 fan_in개보다 많으면 여러 단계로 병합
+    stats = stats if stats is not None else {}
+    pairs = ((timestamp, message) for timestamp, _, message in records)
+    with tempfile.TemporaryDirectory(prefix='mission_sort_', dir=tmp_dir) as workdir:
+        runs = []
+        chunk = []
+        for seq, (epoch, timestamp, message) in enumerate(_keyed(pairs, line_parser(parser), stats)):
+            chunk.append((-epoch, seq, timestamp, message))
+            if len(chunk) >= run_size:
+                chunk.sort()
+                runs.append(_write_run(chunk, workdir, len(runs)))
+                chunk = []
+        chunk.sort()
+        if not runs:
+            # 한 run에 다 들어가면 디스크를 거치지 않음
+            for _, _, timestamp, message in chunk:
+                yield timestamp, message
+            return
+        if chunk:
+            runs.append(_write_run(chunk, workdir, len(runs)))
+        chunk = None
+        stats['runs'] = len(runs)
+        generation = 0
+        while len(runs) > fan_in:
+            generation += 1
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                group = runs[i:i + fan_in]
+                merged.append(_write_run(heapq.merge(*map(_read_run, group)), workdir, f'{generation}-{i}'))
+                for path in group:
+                    os.remove(path)
+            runs = merged
+        for _, _, timestamp, message in heapq.merge(*map(_read_run, runs)):
+            yield timestamp, message
+
+
+def ordered_pairs(records, order, parser='fast', stats=None):
+    # 'file': 파일 순서 그대로 (상수 메모리)
+    # 'reverse': 시간 역순 (메모리 정렬, (epoch, timestamp, message)만 보관)
+    # 안정 정렬이라 같은 시각은 원래 순서 유지 (기존 main.py와 같은 결과), 시각을 읽을 수 없는 줄은 건너뜀
+    pairs = ((timestamp, message) for timestamp, _, message in records)
+    if order == 'file':
+        return pairs
+    if order == 'external':
+        return external_sort(records, parser, stats=stats)
+    if order != 'reverse':
+        raise ValueError(f'Unknown order: {order}')
+    if parser == 'numpy':
+        timestamps, messages = [], []
+        for timestamp, message in pairs:
+            timestamps.append(timestamp)
+            messages.append(message)
+        epochs, bad = parse_timestamps(timestamps)
+        good = np.flatnonzero(~bad)
+        skipped = int(bad.sum())
+        order_index = good[np.argsort(-epochs[good], kind='stable')]
+        result = [(timestamps[i], messages[i]) for i in order_index]
+    else:
+        skipped = 0
+        keyed = []
+        for timestamp, message in pairs:
+            try:
+                keyed.append((line_parser(parser)(timestamp), timestamp, message))
+            except ValueError:
+                skipped += 1
+        keyed.sort(key=lambda item: item[0], reverse=True)
+        result = [(timestamp, message) for _, timestamp, message in keyed]
+    if stats is not None:
+        stats['skipped'] = stats.get('skipped', 0) + skipped
+    return result
+
+
+def convert(log_path=LOG_PATH, json_path=JSON_PATH, order='auto', echo=True, parser='fast', run_size=RUN_SIZE,
+            tmp_dir=None):
+    # order='auto': 먼저 한 번 훑어 이미 시간순이면 역방향 읽기, 역순이면 그대로,
+    # 아니면 run_size줄 이하는 메모리 정렬, 그보다 크면 외부 정렬 -> 어느 경우든 메모리 사용량이 로그 크기와 무관
+    stats = {'skipped': 0}
+    echo = sys.stdout if echo else None
+    pairs = None
+    if order == 'auto':
+        direction, count = detect_order(log_path, parser, echo)
+        echo = None  # 원문은 첫 번째 읽기에서 이미 출력
+        stats['detected'] = direction or 'unsorted'
+        if direction == 'ascending':
+            order = 'reverse-read'
+            pairs = reverse_sorted_file(log_path, parser, stats)
+        elif direction == 'descending':
+            order = 'file'
+            records = ((timestamp, message) for timestamp, _, message in iter_records(log_path, stats=stats))
+            pairs = ((timestamp, message) for _, timestamp, message in _keyed(records, line_parser(parser), stats))
+        else:
+            order = 'reverse' if count <= run_size else 'external'
+    if pairs is None:
+        records = iter_records(log_path, echo, stats)
+        if order == 'external':
+            pairs = external_sort(records, parser, run_size, tmp_dir, stats=stats)
+        else:
+            pairs = ordered_pairs(records, order, parser, stats)
+    stats['order'] = order
+    stats['written'] = write_json(pairs, json_path)
+    return stats
@@ -0,0 +1,126 @@
+import argparse
+import bisect
+import json
+import mmap
+import os
+import time
+from datetime import datetime
+
+from mission_sinks import HEADER, INDEX_ENTRY, decode_binary, make_sink
+
+# RecorderSink('record:경로')로 녹화한 파일을 메모리 맵으로 열어 원래 간격대로 (또는 speed배 빠르게) 다시 내보냄
+# 사용 예) python mission_replay.py mission.rec --speed 1000 --sink stdout-compact
+#         python mission_replay.py mission.rec --speed max --from "2023-08-27 10:00:00" --sink ndjson:incident.ndjson
+
+# 녹화 파일은 배치 안에서만 ts 순서 (멀티스레드/멀티프로세스 모드는 배치 사이에 조금 역전될 수 있음)
+# -> --from/--to 경계에서 이 시간(초)만큼 더 앞에서 시작하고 더 뒤까지 읽은 뒤 범위 밖 레코드는 건너뜀
+REORDER_SLACK = 5.0
+
+
+class Replayer:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.index_ts, self.index_offsets = self._load_index(f'{path}.idx', size)
+
+    @staticmethod
+    def _load_index(path, size):
+        timestamps, offsets = [], []
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            for i in range(0, len(data) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size):
+                ts, offset = INDEX_ENTRY.unpack_from(data, i)
+                if offset < size:
+                    timestamps.append(ts)
+                    offsets.append(offset)
+        return timestamps, offsets
+
+    def seek(self, ts):
+        # ts 이전의 마지막 인덱스 위치 (인덱스가 없으면 처음부터)
+        i = bisect.bisect_right(self.index_ts, ts) - 1
+        return self.index_offsets[i] if i >= 0 else 0
+
+    def records(self, start=None, end=None):
+        offset = self.seek(start - REORDER_SLACK) if start is not None else 0
+        size = len(self.buffer)
+        while offset + HEADER.size <= size:
+            _, _, source_len, payload_len = HEADER.unpack_from(self.buffer, offset)
+            if offset + HEADER.size + source_len + payload_len > size:
+                break  # 녹화 도중 잘린 마지막 레코드
+            record, offset = decode_binary(self.buffer, offset)
+            if start is not None and record['ts'] < start:
+                continue
+            if end is not None and record['ts'] > end:
+                if record['ts'] > end + REORDER_SLACK:
+                    break
+                continue
+            yield record
+
+    def replay(self, sink, speed=1.0, start=None, end=None):
+        # speed=None이면 기다리지 않고 최대 속도. 레코드의 ts는 원래 값 그대로 유지
+        count = 0
+        max_lag = 0.0
+        first_ts = None
+        wall_start = time.monotonic()
+        for record in self.records(start, end):
+            if first_ts is None:
+                first_ts = record['ts']
+            if speed:
+                due = wall_start + (record['ts'] - first_ts) / speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+            sink.write(record)
+            count += 1
+        sink.flush()
+        elapsed = time.monotonic() - wall_start
+        return {
+            'records': count,
+            'speed': speed or 'max',
+            'elapsed_s': round(elapsed, 3),
+            'records_per_sec': round(count / elapsed, 1) if elapsed else 0.0,
+            'max_lag_ms': round(max_lag * 1000, 3),
+        }
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+
+def parse_time(value):
+    # epoch 초 또는 'YYYY-MM-DD HH:MM:SS'
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S').timestamp()
+
+
+def parse_speed(value):
+    if value == 'max':
+        return None
+    return float(value.rstrip('x'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a recorded mission computer stream')
+    parser.add_argument('path')
+    parser.add_argument('--speed', default='1', help="1, 10, 1000 (or 10x ...), or 'max'")
+    parser.add_argument('--sink', default='stdout', help="same specs as MARS_SINK")
+    parser.add_argument('--from', dest='start', type=parse_time)
+    parser.add_argument('--to', dest='end', type=parse_time)
+    args = parser.parse_args()
+
+    replayer = Replayer(args.path)
+    sink = make_sink(args.sink)
+    try:
+        stats = replayer.replay(sink, parse_speed(args.speed), args.start, args.end)
+    finally:
+        sink.close()
+        replayer.close()
+    print(f"Replay (Stats): \n{json.dumps(stats, indent=4)}")
@@ -0,0 +1,101 @@
+import heapq
+import itertools
+import time
+from collections import deque
+
+
+class JitterStats:
+    # 예정 시각 대비 실제 실행 지연(초) 통계. 분위수는 최근 window개로 계산
+    def __init__(self, window=1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, lateness):
+        self.count += 1
+        self.total += lateness
+        self.max = max(self.max, lateness)
+        self.recent.append(lateness)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        p99 = recent[min(len(recent) - 1, int(0.99 * len(recent)))] if recent else 0.0
+        return {
+            'runs': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p99_ms': round(p99 * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class PeriodicJob:
+    def __init__(self, name, period, func, start):
+        self.name = name
+        self.period = period
+        self.func = func
+        self.start = start
+        self.index = 0
+        self.skipped = 0
+        self.errors = 0
+        self.stats = JitterStats()
+
+    def due(self):
+        # drift 없음: 항상 start + k * period 기준 (실행 시간이 다음 예정 시각을 밀지 않음)
+        return self.start + self.index * self.period
+
+
+class PeriodicScheduler:
+    # 스레드 하나 + 타이머 힙: 다음 예정 시각까지 잠들어 있으므로 유휴 CPU가 거의 0
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.heap = []
+        self.jobs = []
+        self.counter = itertools.count()
+        self.running = False
+
+    def add(self, name, period, func, offset=0.0):
+        job = PeriodicJob(name, period, func, self.clock() + offset)
+        self.jobs.append(job)
+        heapq.heappush(self.heap, (job.due(), next(self.counter), job))
+        return job
+
+    def stop(self):
+        self.running = False
+
+    def run(self, duration=None):
+        end = self.clock() + duration if duration is not None else None
+        self.running = True
+        while self.running and self.heap:
+            due, _, job = self.heap[0]
+            now = self.clock()
+            if end is not None and min(due, now) >= end:
+                break
+            if due > now:
+                self.sleep(min(due, end) - now if end is not None else due - now)
+                continue
+
+            heapq.heappop(self.heap)
+            job.stats.add(now - due)
+            try:
+                job.func()
+            except Exception as e:
+                job.errors += 1
+                print(f'Error in job {job.name}: {e}')
+
+            job.index += 1
+            now = self.clock()
+            if job.due() <= now:
+                # 너무 늦어 이미 지난 주기는 몰아서 실행하지 않고 건너뜀
+                missed = int((now - job.start) // job.period) + 1 - job.index
+                job.index += missed
+                job.skipped += missed
+            heapq.heappush(self.heap, (job.due(), next(self.counter), job))
+        self.running = False
+
+    def stats(self):
+        return {
+            job.name: dict(job.stats.summary(), period_s=job.period, skipped=job.skipped, errors=job.errors)
+            for job in self.jobs
+        }
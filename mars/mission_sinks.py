@@ -0,0 +1,259 @@
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+
+# 레코드: {'source': 'Thread runComputer1', 'kind': 'Sensor', 'ts': epoch 초, 'data': {...}}
+KINDS = ['Sensor', 'Info', 'Load', 'Alert', 'Jitter']  # 바이너리 코드 = 순서, 새 종류는 끝에만 추가
+SENSOR_FIELDS = [
+    'mars_base_internal_temperature',
+    'mars_base_external_temperature',
+    'mars_base_internal_humidity',
+    'mars_base_external_illuminance',
+    'mars_base_internal_co2',
+    'mars_base_internal_oxygen',
+]
+
+# 바이너리 레코드 헤더: ts(float64), kind(uint8), source 길이(uint8), payload 길이(uint16)
+HEADER = struct.Struct('<dBBH')
+# Sensor payload: 모든 값을 float64로 저장 -> 디코딩(재생)하면 정수 센서 값도 float (18 -> 18.0)
+SENSOR_PAYLOAD = struct.Struct('<' + 'd' * len(SENSOR_FIELDS))
+# 녹화 파일의 타임스탬프 인덱스 항목: ts(float64), 데이터 파일 오프셋(uint64)
+INDEX_ENTRY = struct.Struct('<dQ')
+
+
+def make_record(source, kind, data, ts=None):
+    return {'source': source, 'kind': kind, 'ts': ts if ts is not None else time.time(), 'data': data}
+
+
+def encode_binary(record):
+    # Sensor는 float64 6개 고정 배열, 나머지는 압축 JSON
+    kind = KINDS.index(record['kind'])
+    source = record['source'].encode('utf-8')[:255]
+    if record['kind'] == 'Sensor':
+        payload = SENSOR_PAYLOAD.pack(*(float(record['data'].get(name, 0)) for name in SENSOR_FIELDS))
+    else:
+        payload = json.dumps(record['data'], separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(record['ts'], kind, len(source), len(payload)) + source + payload
+
+
+def decode_binary(buffer, offset=0):
+    # (레코드, 다음 오프셋)
+    ts, kind, source_len, payload_len = HEADER.unpack_from(buffer, offset)
+    start = offset + HEADER.size
+    source = bytes(buffer[start:start + source_len]).decode('utf-8')
+    payload = buffer[start + source_len:start + source_len + payload_len]
+    if KINDS[kind] == 'Sensor':
+        data = dict(zip(SENSOR_FIELDS, SENSOR_PAYLOAD.unpack(payload)))
+    else:
+        data = json.loads(bytes(payload).decode('utf-8'))
+    return make_record(source, KINDS[kind], data, ts), start + source_len + payload_len
+
+
+def read_binary(path):
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    offset = 0
+    while offset + HEADER.size <= len(buffer):
+        record, offset = decode_binary(buffer, offset)
+        yield record
+
+
+class BufferedSink:
+    # 레코드를 모아 batch_size개 또는 flush_interval초마다 한 번에 기록 (스레드 안전)
+    # flush_interval > 0이면 flusher 스레드가 주기적으로 확인 -> 다음 레코드가 오지 않아도 늦어도 그 시간 안에 기록
+    def __init__(self, batch_size=64, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.written = 0
+        self.closed = threading.Event()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_periodically, name=f'{type(self).__name__}-flusher', daemon=True).start()
+
+    def _flush_periodically(self):
+        while not self.closed.wait(self.flush_interval):
+            with self.lock:
+                if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+                    self._flush_locked()
+
+    def write(self, record):
+        with self.lock:
+            self.buffer.append(record)
+            if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self.buffer:
+            self._write_batch(self.buffer)
+            self.written += len(self.buffer)
+            self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def _write_batch(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        self.closed.set()
+        self.flush()
+
+
+class StdoutSink(BufferedSink):
+    # 사람이 읽는 모드: 기존과 같은 '{source} [시각] (kind):' + 들여쓴 JSON. compact=True면 한 줄
+    def __init__(self, compact=False, batch_size=1, flush_interval=0.0, stream=None):
+        super().__init__(batch_size, flush_interval)
+        self.compact = compact
+        self.stream = stream or sys.stdout
+
+    def _write_batch(self, records):
+        parts = []
+        for record in records:
+            timestamp = datetime.fromtimestamp(record['ts']).strftime('%Y-%m-%d %H:%M:%S')
+            if self.compact:
+                body = json.dumps(record['data'], separators=(',', ':'))
+                parts.append(f"{record['source']} [{timestamp}] ({record['kind']}): {body}\n")
+            else:
+                parts.append(f"{record['source']} [{timestamp}] ({record['kind']}): \n{json.dumps(record['data'], indent=4)}\n")
+        self.stream.write(''.join(parts))
+        self.stream.flush()
+
+
+class NDJSONSink(BufferedSink):
+    # 한 줄에 레코드 하나 (압축 JSON), 배치마다 write 한 번
+    def __init__(self, path, batch_size=64, flush_interval=1.0):
+        super().__init__(batch_size, flush_interval)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def _write_batch(self, records):
+        self.file.write(''.join(json.dumps(r, separators=(',', ':'), ensure_ascii=False) + '\n' for r in records))
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class BinarySink(BufferedSink):
+    # 압축 바이너리 레코드 (encode_binary 형식), 읽기는 read_binary
+    def __init__(self, path, batch_size=256, flush_interval=1.0):
+        super().__init__(batch_size, flush_interval)
+        self.file = open(path, 'ab')
+
+    def _write_batch(self, records):
+        self.file.write(b''.join(encode_binary(r) for r in records))
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class RecorderSink(BufferedSink):
+    # 녹화: BinarySink와 같은 레코드를 append-only로 기록 + '{path}.idx'에 index_every개마다 (ts, 오프셋)
+    # 인덱스는 데이터를 쓴 뒤에 기록하므로 중간에 죽어도 인덱스가 가리키는 위치는 항상 유효함
+    # 여러 스레드/프로세스의 레코드는 ts 순서로 도착하지 않으므로 배치마다 ts로 정렬해서 기록
+    # (배치 사이의 역전은 남을 수 있음 -> 재생 쪽에서 REORDER_SLACK만큼 더 읽음)
+    # Sensor 값은 float64로 저장되므로 재생하면 정수도 float. 재생은 mission_replay.py
+    def __init__(self, path, batch_size=256, flush_interval=1.0, index_every=64):
+        super().__init__(batch_size, flush_interval)
+        self.index_every = index_every
+        self.file = open(path, 'ab')
+        self.index = open(f'{path}.idx', 'ab')
+        self.offset = self.file.seek(0, 2)
+        self.count = 0
+
+    def _write_batch(self, records):
+        chunks = []
+        entries = []
+        offset = self.offset
+        for record in sorted(records, key=lambda r: r['ts']):
+            data = encode_binary(record)
+            if self.count % self.index_every == 0:
+                entries.append(INDEX_ENTRY.pack(record['ts'], offset))
+            chunks.append(data)
+            offset += len(data)
+            self.count += 1
+        self.file.write(b''.join(chunks))
+        self.file.flush()
+        self.offset = offset
+        if entries:
+            self.index.write(b''.join(entries))
+            self.index.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+        self.index.close()
+
+
+class MultiSink:
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+    def write(self, record):
+        for sink in self.sinks:
+            sink.write(record)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class QueueSink:
+    # 자식 프로세스용: 레코드를 큐로 보내고 부모의 writer 하나가 기록 -> 프로세스 간 줄 섞임 없음
+    def __init__(self, record_queue):
+        self.queue = record_queue
+
+    def write(self, record):
+        self.queue.put(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def drain_queue(record_queue, sink, stop_event, poll_interval=0.5):
+    # 부모 프로세스의 writer: 큐에서 꺼내 실제 sink로 기록, 한동안 조용하면 버퍼 flush
+    while not stop_event.is_set() or not record_queue.empty():
+        try:
+            record = record_queue.get(timeout=poll_interval)
+        except queue.Empty:
+            sink.flush()
+            continue
+        sink.write(record)
+    sink.flush()
+
+
+def make_sink(spec):
+    # 'stdout', 'stdout-compact', 'ndjson:경로', 'binary:경로', 'record:경로' (쉼표로 여러 개)
+    sinks = []
+    for part in spec.split(','):
+        kind, _, path = part.strip().partition(':')
+        if kind == 'stdout':
+            sinks.append(StdoutSink())
+        elif kind == 'stdout-compact':
+            sinks.append(StdoutSink(compact=True))
+        elif kind == 'ndjson' and path:
+            sinks.append(NDJSONSink(path))
+        elif kind == 'binary' and path:
+            sinks.append(BinarySink(path))
+        elif kind == 'record' and path:
+            sinks.append(RecorderSink(path))
+        else:
+            raise ValueError(f'Unknown sink: {part}')
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
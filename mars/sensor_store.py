@@ -0,0 +1,100 @@
+import os
+import time
+
+import numpy as np
+
+
+class SensorStore:
+    # 지표(metric)마다 고정 크기 링 버퍼 하나 + int64 타임스탬프(epoch ms) 링 버퍼
+    # path를 주면 두 버퍼를 메모리 맵 .npy 파일로 두어 재시작 후 그대로 이어 씀
+    def __init__(self, metrics, capacity=17280, path=None):
+        self.metrics = list(metrics)
+        self.index = {name: i for i, name in enumerate(self.metrics)}
+        self.capacity = capacity
+        self.path = path
+        shape = (len(self.metrics), capacity)
+        if path:
+            self.timestamps = self._open(f'{path}.timestamps.npy', (capacity,), np.int64)
+            self.values = self._open(f'{path}.values.npy', shape, np.float64)
+        else:
+            self.timestamps = np.zeros(capacity, dtype=np.int64)
+            self.values = np.full(shape, np.nan)
+        # 재시작: 0이 아닌 타임스탬프 개수 = 크기, 가장 최근 값의 다음 칸 = head
+        self.size = int(np.count_nonzero(self.timestamps))
+        latest = capacity - 1 - int(np.argmax(self.timestamps[::-1]))
+        self.head = (latest + 1) % capacity if self.size else 0
+
+    @staticmethod
+    def _open(filename, shape, dtype):
+        if os.path.exists(filename):
+            array = np.load(filename, mmap_mode='r+')
+            if array.shape == shape and array.dtype == dtype:
+                return array
+            raise ValueError(f'{filename}: shape {array.shape} does not match {shape}')
+        array = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=shape)
+        if dtype == np.float64:
+            array[:] = np.nan
+        return array
+
+    def append(self, values, timestamp=None):
+        # O(1): head 칸에 덮어쓰고 한 칸 전진
+        ts = int(timestamp * 1000) if timestamp is not None else time.time_ns() // 1_000_000
+        self.timestamps[self.head] = ts
+        for name, value in values.items():
+            i = self.index.get(name)
+            if i is not None:
+                self.values[i, self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _window_count(self, seconds, now):
+        # 링 버퍼는 시간순이므로 두 구간(오래된 쪽/최근 쪽)에서 이분 탐색
+        start = int((now if now is not None else time.time()) * 1000) - int(seconds * 1000)
+        if self.size < self.capacity:
+            older, newer = self.timestamps[:0], self.timestamps[:self.size]
+        else:
+            older, newer = self.timestamps[self.head:], self.timestamps[:self.head]
+        count = len(newer) - int(np.searchsorted(newer, start))
+        if count == len(newer):
+            count += len(older) - int(np.searchsorted(older, start))
+        return count
+
+    def window(self, metric, seconds, now=None):
+        # 최근 seconds초 값 (시간순)
+        count = self._window_count(seconds, now)
+        row = self.values[self.index[metric]]
+        if count <= self.head:
+            return np.array(row[self.head - count:self.head])
+        return np.concatenate((row[self.capacity - (count - self.head):], row[:self.head]))
+
+    def window_timestamps(self, seconds, now=None):
+        count = self._window_count(seconds, now)
+        if count <= self.head:
+            return np.array(self.timestamps[self.head - count:self.head])
+        return np.concatenate((self.timestamps[self.capacity - (count - self.head):], self.timestamps[:self.head]))
+
+    def summary(self, metric, seconds, percentiles=(50, 95), now=None):
+        data = self.window(metric, seconds, now)
+        data = data[~np.isnan(data)]
+        if data.size == 0:
+            return {'count': 0}
+        result = {
+            'count': int(data.size),
+            'mean': round(float(data.mean()), 3),
+            'min': float(data.min()),
+            'max': float(data.max()),
+        }
+        for p, value in zip(percentiles, np.percentile(data, percentiles)):
+            result[f'p{p}'] = round(float(value), 3)
+        return result
+
+    def snapshot(self):
+        # 메모리 맵 버퍼를 디스크로 내보냄 (path 없이 만든 저장소는 save() 사용)
+        if self.path:
+            self.timestamps.flush()
+            self.values.flush()
+
+    def save(self, path):
+        # 메모리 저장소를 나중에 SensorStore(..., path=path)로 열 수 있는 .npy 파일로 저장
+        np.save(f'{path}.timestamps.npy', np.asarray(self.timestamps))
+        np.save(f'{path}.values.npy', np.asarray(self.values))
@@ -0,0 +1,66 @@
+import argparse
+import calendar
+import random
+import time
+from datetime import datetime
+
+from mission_log import TIME_FORMAT, parse_timestamp, parse_timestamps
+
+# 타임스탬프 파싱 마이크로 벤치마크: strptime vs 슬라이스 fast path vs NumPy datetime64 일괄 변환
+# 사용 예) python timestamp_benchmark.py --lines 1000000
+
+
+def make_timestamps(count, malformed, seed):
+    # 하루 범위의 로그 시각 (시간순), malformed 비율만큼 자리수가 다른 줄 섞기
+    rng = random.Random(seed)
+    start = datetime(2023, 8, 27).timestamp()
+    step = 86400 / max(count, 1)
+    texts = []
+    for i in range(count):
+        dt = datetime.fromtimestamp(start + i * step)
+        if rng.random() < malformed:
+            texts.append(f'{dt.year}-{dt.month}-{dt.day} {dt.hour}:{dt.minute}:{dt.second}')
+        else:
+            texts.append(dt.strftime(TIME_FORMAT))
+    return texts
+
+
+def best_of(repeat, func, texts):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_strptime(texts):
+    return [calendar.timegm(datetime.strptime(text, TIME_FORMAT).timetuple()) for text in texts]
+
+
+def run_fast(texts):
+    return [parse_timestamp(text) for text in texts]
+
+
+def run_numpy(texts):
+    return parse_timestamps(texts)[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Timestamp parsing micro-benchmark')
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--malformed', type=float, default=0.001, help='fraction of non fixed-width timestamps')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    texts = make_timestamps(args.lines, args.malformed, args.seed)
+    expected = run_strptime(texts)
+    assert run_fast(texts) == expected
+    assert run_numpy(texts).tolist() == expected
+
+    baseline = best_of(args.repeat, run_strptime, texts)
+    for name, func in (('strptime', run_strptime), ('fast', run_fast), ('numpy', run_numpy)):
+        elapsed = baseline if name == 'strptime' else best_of(args.repeat, func, texts)
+        print(f'{name:9} {elapsed * 1000:9.1f} ms  {args.lines / elapsed / 1e6:6.2f} M lines/s  x{baseline / elapsed:.1f}')